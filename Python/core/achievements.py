@@ -0,0 +1,75 @@
+import time
+from collections import deque
+from typing import Dict, Any, List, Deque, Iterable
+
+class AchievementIndex:
+    """Правила достижений, проиндексированные по типу события.
+
+    Правило — словарь:
+        'name'        — название достижения;
+        'event'       — тип события (ключ из XP_MAP или произвольный);
+        'count'       — порог счётчика событий (по умолчанию 1);
+        'window_sec'  — если задано, 'count' событий должны уложиться в окно;
+        'min_value' / 'max_value' — условие на значение события;
+        'reward_action' — действие, за которое начисляется XP при получении.
+    """
+
+    def __init__(self, rules: Iterable[Dict[str, Any]], unlocked: Iterable[str] = (),
+                 counters: Dict[str, int] | None = None):
+        self.counters: Dict[str, int] = dict(counters or {})
+        # Чистые пороги счётчика отсортированы: проверяется только ближайший.
+        self._thresholds_by_event: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._rules_by_event: Dict[str, List[Dict[str, Any]]] = {}
+        self._windows: Dict[str, Deque[float]] = {}
+
+        unlocked = set(unlocked)
+        for rule in sorted(rules, key=lambda r: r.get('count', 1)):
+            if rule['name'] in unlocked:
+                continue
+            if self._is_plain_threshold(rule):
+                self._thresholds_by_event.setdefault(rule['event'], deque()).append(rule)
+            else:
+                self._rules_by_event.setdefault(rule['event'], []).append(rule)
+                if rule.get('window_sec'):
+                    self._windows[rule['name']] = deque(maxlen=rule.get('count', 1))
+
+    @staticmethod
+    def _is_plain_threshold(rule: Dict[str, Any]) -> bool:
+        return not any(key in rule for key in ('window_sec', 'min_value', 'max_value'))
+
+    def _matches(self, rule: Dict[str, Any], value: float | None, now: float) -> bool:
+        if 'min_value' in rule or 'max_value' in rule:
+            if value is None:
+                return False
+            if 'min_value' in rule and value < rule['min_value']:
+                return False
+            if 'max_value' in rule and value > rule['max_value']:
+                return False
+
+        threshold = rule.get('count', 1)
+        window = self._windows.get(rule['name'])
+        if window is not None:
+            window.append(now)
+            return len(window) == threshold and now - window[0] <= rule['window_sec']
+
+        return self.counters.get(rule['event'], 0) >= threshold
+
+    def process(self, event: str, amount: int = 1, value: float | None = None) -> List[Dict[str, Any]]:
+        total = self.counters[event] = self.counters.get(event, 0) + amount
+        unlocked: List[Dict[str, Any]] = []
+
+        thresholds = self._thresholds_by_event.get(event)
+        while thresholds and thresholds[0].get('count', 1) <= total:
+            unlocked.append(thresholds.popleft())
+
+        rules = self._rules_by_event.get(event)
+        if rules:
+            now = time.monotonic()
+            matched = [rule for rule in rules if self._matches(rule, value, now)]
+            if matched:
+                self._rules_by_event[event] = [rule for rule in rules if rule not in matched]
+                for rule in matched:
+                    self._windows.pop(rule['name'], None)
+                unlocked.extend(matched)
+
+        return unlocked
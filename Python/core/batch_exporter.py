@@ -4,10 +4,12 @@ from typing import Dict, Any, List
 
 from core.database import db_manager
 from core.gamification import gamification_engine
+from core.metrics import metrics
+from core.validation import DIFFICULTY_OPTIONS
 
 class BatchExporter:
     
-    DIFFICULTY_OPTIONS = ['Легкий', 'Средний', 'Сложный', 'Эпический']
+    DIFFICULTY_OPTIONS = DIFFICULTY_OPTIONS
     QUEST_TEMPLATES = [
         "Поиск Древнего Артефакта",
         "Спасение Принцессы из Башни",
@@ -42,7 +44,7 @@ class BatchExporter:
     @staticmethod
     def generate_100_quests() -> float:
         db = db_manager 
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         created_count = 0
         total_quests_to_generate = 100
@@ -64,10 +66,12 @@ class BatchExporter:
                 print(f"❌ Критическая ошибка при генерации квеста {i}: {e}. Операция прервана.")
                 break
 
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
+        metrics.record("batch.boss_fight", elapsed_time * 1000.0)
         
-        gamification_engine.grant_xp("BOSS_FIGHT") 
-        gamification_engine.check_achievements(created_count, elapsed_time)
+        gamification_engine.record_event("QUEST_CREATED", amount=created_count)
+        gamification_engine.record_event("BOSS_FIGHT_QUESTS", value=created_count)
+        gamification_engine.grant_xp("BOSS_FIGHT", value=elapsed_time)
         
         print("\n✅ БОСС-ФАЙТ ЗАВЕРШЕН!")
         print(f"Создано квестов: {created_count} из {total_quests_to_generate}")
@@ -1,14 +1,107 @@
+import os
 import sqlite3
-from typing import Dict, Any, List
+from urllib.request import pathname2url
+from typing import Dict, Any, List, Tuple
+
+from core.metrics import metrics
+from core.lazy import LazyInstance
 
 class DatabaseManager:
     
     DB_NAME = "quest_master.db"
+    ARCHIVE_SUFFIX = "_archive"
+    ARCHIVE_MAX_AGE_DAYS = 365
+    ARCHIVE_BATCH_SIZE = 500
+
+    QUEST_COLUMNS = "id, title, difficulty, reward, description, deadline, created_at"
+    VERSION_COLUMNS = "id, quest_id, title, difficulty, reward, description, created_at"
+    MAP_COLUMNS = "id, quest_id, background_path, updated_at"
+    MAP_ELEMENT_COLUMNS = "map_id, uid, kind, x, y, text, style, points"
 
-    def __init__(self):
-        self._conn = sqlite3.connect(self.DB_NAME)
+    def __init__(self, db_path: str | None = None, read_only: bool = False):
+        self.db_path = db_path or self.DB_NAME
+        self.read_only = read_only
+        if read_only:
+            # Соединение только для чтения (пул сервера квестов): схему не трогает,
+            # по очереди используется разными потоками.
+            self._conn = sqlite3.connect(self._readonly_uri(self.db_path), uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(self.db_path)
         self._cursor = self._conn.cursor()
-        self._init_db()
+        if not read_only:
+            self._init_db()
+            self._init_statistics()
+        self._attach_archive()
+
+    @staticmethod
+    def _readonly_uri(path: str) -> str:
+        return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+    @classmethod
+    def archive_path_for(cls, db_path: str) -> str:
+        if db_path == ":memory:":
+            return db_path
+        root, ext = os.path.splitext(db_path)
+        return f"{root}{cls.ARCHIVE_SUFFIX}{ext or '.db'}"
+
+    def _attach_archive(self):
+        """Холодные квесты и их версии живут в отдельном файле, подключённом как схема archive."""
+        self.archive_path = self.archive_path_for(self.db_path)
+        attach_path = self.archive_path
+        if self.read_only:
+            # Схему архива ведут соединения с записью; отсутствующий архив заменяется
+            # пустым в памяти, чтобы запросы к archive.* работали.
+            if attach_path != ":memory:" and os.path.exists(attach_path):
+                self._cursor.execute("ATTACH DATABASE ? AS archive", (self._readonly_uri(attach_path),))
+                return
+            attach_path = ":memory:"
+        self._cursor.execute("ATTACH DATABASE ? AS archive", (attach_path,))
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.quests (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                difficulty TEXT,
+                reward INTEGER,
+                description TEXT,
+                deadline TEXT,
+                created_at TIMESTAMP,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.quest_versions (
+                id INTEGER PRIMARY KEY,
+                quest_id INTEGER,
+                title TEXT,
+                difficulty TEXT,
+                reward INTEGER,
+                description TEXT,
+                created_at TIMESTAMP
+            );
+        """)
+        self._cursor.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_versions_quest ON quest_versions(quest_id)")
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.maps (
+                id INTEGER PRIMARY KEY,
+                quest_id INTEGER UNIQUE,
+                background_path TEXT,
+                updated_at TIMESTAMP
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.map_elements (
+                map_id INTEGER NOT NULL,
+                uid TEXT NOT NULL,
+                kind TEXT,
+                x REAL,
+                y REAL,
+                text TEXT,
+                style TEXT,
+                points BLOB,
+                PRIMARY KEY (map_id, uid)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
 
     def _init_db(self):
         self._cursor.execute("""
@@ -34,8 +127,148 @@ class DatabaseManager:
                 FOREIGN KEY (quest_id) REFERENCES quests(id)
             );
         """)
+        self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_quest_versions_quest ON quest_versions(quest_id)")
+        self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_quests_deadline ON quests(deadline)")
+        self._cursor.execute("CREATE INDEX IF NOT EXISTS idx_quests_created_at ON quests(created_at)")
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS maps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                quest_id INTEGER UNIQUE,
+                background_path TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (quest_id) REFERENCES quests(id)
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS map_elements (
+                map_id INTEGER NOT NULL,
+                uid TEXT NOT NULL,
+                kind TEXT CHECK(kind IN ('stroke','marker','label')),
+                x REAL,
+                y REAL,
+                text TEXT,
+                style TEXT,
+                points BLOB,
+                PRIMARY KEY (map_id, uid),
+                FOREIGN KEY (map_id) REFERENCES maps(id)
+            ) WITHOUT ROWID;
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                source TEXT PRIMARY KEY,
+                file_size INTEGER,
+                file_mtime INTEGER,
+                rows_done INTEGER NOT NULL DEFAULT 0,
+                imported INTEGER NOT NULL DEFAULT 0,
+                rejected INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS xp_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                action_key TEXT NOT NULL,
+                xp INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS xp_totals (
+                id INTEGER PRIMARY KEY CHECK(id = 1),
+                total_xp INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._cursor.execute("INSERT OR IGNORE INTO xp_totals (id, total_xp) VALUES (1, 0)")
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS event_counters (
+                event TEXT PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._cursor.execute("""
+            CREATE TABLE IF NOT EXISTS achievements (
+                name TEXT PRIMARY KEY,
+                unlocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
         self._conn.commit()
 
+    def _init_statistics(self):
+        """Сводные таблицы статистики, которые поддерживают триггеры на quests/quest_versions."""
+        self._cursor.executescript("""
+            CREATE TABLE IF NOT EXISTS stats_by_difficulty (
+                difficulty TEXT PRIMARY KEY,
+                quest_count INTEGER NOT NULL DEFAULT 0,
+                reward_sum INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS stats_deadline_days (
+                day TEXT PRIMARY KEY,
+                quest_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS stats_version_counts (
+                quest_id INTEGER PRIMARY KEY,
+                version_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS stats_totals (
+                id INTEGER PRIMARY KEY CHECK(id = 1),
+                version_count INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_quest_insert AFTER INSERT ON quests
+            BEGIN
+                INSERT INTO stats_by_difficulty (difficulty, quest_count, reward_sum)
+                VALUES (COALESCE(NEW.difficulty, ''), 1, COALESCE(NEW.reward, 0))
+                ON CONFLICT(difficulty) DO UPDATE SET
+                    quest_count = quest_count + 1, reward_sum = reward_sum + excluded.reward_sum;
+                INSERT INTO stats_deadline_days (day, quest_count)
+                SELECT substr(NEW.deadline, 1, 10), 1 WHERE NEW.deadline IS NOT NULL
+                ON CONFLICT(day) DO UPDATE SET quest_count = quest_count + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_quest_delete AFTER DELETE ON quests
+            BEGIN
+                UPDATE stats_by_difficulty
+                SET quest_count = quest_count - 1, reward_sum = reward_sum - COALESCE(OLD.reward, 0)
+                WHERE difficulty = COALESCE(OLD.difficulty, '');
+                UPDATE stats_deadline_days SET quest_count = quest_count - 1
+                WHERE day = substr(OLD.deadline, 1, 10);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_quest_update AFTER UPDATE OF difficulty, reward, deadline ON quests
+            BEGIN
+                UPDATE stats_by_difficulty
+                SET quest_count = quest_count - 1, reward_sum = reward_sum - COALESCE(OLD.reward, 0)
+                WHERE difficulty = COALESCE(OLD.difficulty, '');
+                INSERT INTO stats_by_difficulty (difficulty, quest_count, reward_sum)
+                VALUES (COALESCE(NEW.difficulty, ''), 1, COALESCE(NEW.reward, 0))
+                ON CONFLICT(difficulty) DO UPDATE SET
+                    quest_count = quest_count + 1, reward_sum = reward_sum + excluded.reward_sum;
+                UPDATE stats_deadline_days SET quest_count = quest_count - 1
+                WHERE day = substr(OLD.deadline, 1, 10);
+                INSERT INTO stats_deadline_days (day, quest_count)
+                SELECT substr(NEW.deadline, 1, 10), 1 WHERE NEW.deadline IS NOT NULL
+                ON CONFLICT(day) DO UPDATE SET quest_count = quest_count + 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_version_insert AFTER INSERT ON quest_versions
+            BEGIN
+                INSERT INTO stats_version_counts (quest_id, version_count) VALUES (NEW.quest_id, 1)
+                ON CONFLICT(quest_id) DO UPDATE SET version_count = version_count + 1;
+                UPDATE stats_totals SET version_count = version_count + 1 WHERE id = 1;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_stats_version_delete AFTER DELETE ON quest_versions
+            BEGIN
+                UPDATE stats_version_counts SET version_count = version_count - 1 WHERE quest_id = OLD.quest_id;
+                DELETE FROM stats_version_counts WHERE quest_id = OLD.quest_id AND version_count <= 0;
+                UPDATE stats_totals SET version_count = version_count - 1 WHERE id = 1;
+            END;
+        """)
+        
+        self._cursor.execute("SELECT 1 FROM stats_totals WHERE id = 1")
+        if not self._cursor.fetchone():
+            self.rebuild_statistics()
+
     def create_quest(self, data: Dict[str, Any]) -> int:
         
         data.pop('id', None) 
@@ -45,12 +278,14 @@ class DatabaseManager:
         values = list(data.values())
         
         try:
-            self._cursor.execute(f"INSERT INTO quests ({keys}) VALUES ({placeholders})", values)
-            quest_id = self._cursor.lastrowid
-            self._conn.commit()
-            self._insert_version(quest_id, data)
+            with metrics.span("db.create_quest"):
+                self._cursor.execute(f"INSERT INTO quests ({keys}) VALUES ({placeholders})", values)
+                quest_id = self._cursor.lastrowid
+                self._conn.commit()
+                self._insert_version(quest_id, data)
             return quest_id
         except sqlite3.IntegrityError as e:
+            metrics.incr("db.create_quest.errors")
             print(f"❌ Ошибка при создании квеста: {e}")
             return -1
 
@@ -61,9 +296,10 @@ class DatabaseManager:
         values = list(data.values())
         values.append(quest_id)
         
-        self._cursor.execute(f"UPDATE quests SET {set_clause} WHERE id = ?", values)
-        self._conn.commit()
-        self._insert_version(quest_id, data)
+        with metrics.span("db.update_quest"):
+            self._cursor.execute(f"UPDATE quests SET {set_clause} WHERE id = ?", values)
+            self._conn.commit()
+            self._insert_version(quest_id, data)
 
     def _insert_version(self, quest_id: int, data: Dict[str, Any]):
         version_data = {k: v for k, v in data.items() if k in ['title', 'difficulty', 'reward', 'description']}
@@ -75,18 +311,303 @@ class DatabaseManager:
         self._cursor.execute(f"INSERT INTO quest_versions ({keys}) VALUES ({placeholders})", values)
         self._conn.commit()
 
-    def get_quest(self, quest_id: int) -> Dict[str, Any] | None:
-        self._cursor.execute("SELECT * FROM quests WHERE id = ?", (quest_id,))
-        row = self._cursor.fetchone()
+    def get_quest(self, quest_id: int, include_archive: bool = False) -> Dict[str, Any] | None:
+        with metrics.span("db.get_quest"):
+            self._cursor.execute(f"SELECT {self.QUEST_COLUMNS}, 0 AS archived FROM main.quests WHERE id = ?", (quest_id,))
+            row = self._cursor.fetchone()
+            if not row and include_archive:
+                self._cursor.execute(f"SELECT {self.QUEST_COLUMNS}, 1 AS archived FROM archive.quests WHERE id = ?", (quest_id,))
+                row = self._cursor.fetchone()
         if row:
             cols = [col[0] for col in self._cursor.description]
             return dict(zip(cols, row))
         return None
     
     def get_all_quests(self) -> List[Dict[str, Any]]:
-        self._cursor.execute("SELECT * FROM quests ORDER BY created_at DESC")
+        with metrics.span("db.get_all_quests"):
+            self._cursor.execute("SELECT * FROM quests ORDER BY created_at DESC")
+            rows = self._cursor.fetchall()
+        cols = [col[0] for col in self._cursor.description]
+        return [dict(zip(cols, row)) for row in rows]
+
+    QUEST_FIELDS = ('title', 'difficulty', 'reward', 'description', 'deadline')
+
+    def search_quests(self, text: str, include_archive: bool = True, limit: int = 200) -> List[Dict[str, Any]]:
+        pattern = f"%{text}%"
+        query = f"SELECT {self.QUEST_COLUMNS}, 0 AS archived FROM main.quests WHERE title LIKE ? OR description LIKE ?"
+        params = [pattern, pattern]
+        if include_archive:
+            query += f" UNION ALL SELECT {self.QUEST_COLUMNS}, 1 AS archived FROM archive.quests WHERE title LIKE ? OR description LIKE ?"
+            params += [pattern, pattern]
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        
+        with metrics.span("db.search_quests"):
+            self._cursor.execute(query, params)
+            rows = self._cursor.fetchall()
+        cols = [col[0] for col in self._cursor.description]
+        return [dict(zip(cols, row)) for row in rows]
+
+    def get_quest_history(self, quest_id: int, include_archive: bool = True) -> List[Dict[str, Any]]:
+        query = f"SELECT {self.VERSION_COLUMNS} FROM main.quest_versions WHERE quest_id = ?"
+        params = [quest_id]
+        if include_archive:
+            query += f" UNION ALL SELECT {self.VERSION_COLUMNS} FROM archive.quest_versions WHERE quest_id = ?"
+            params.append(quest_id)
+        query += " ORDER BY id"
+        self._cursor.execute(query, params)
         rows = self._cursor.fetchall()
         cols = [col[0] for col in self._cursor.description]
         return [dict(zip(cols, row)) for row in rows]
 
-db_manager = DatabaseManager()
+    def _move_quests(self, source: str, target: str, quest_ids: List[int]):
+        # Карта переносится вместе с квестом: векторные данные — самая тяжёлая его часть.
+        # id карт и квестов AUTOINCREMENT, поэтому при возврате из архива они не конфликтуют.
+        placeholders = ', '.join('?' * len(quest_ids))
+        map_ids = f"SELECT id FROM {source}.maps WHERE quest_id IN ({placeholders})"
+        # Карта квеста могла появиться и в target (редактор сохранил её после архивации),
+        # поэтому строки сливаются по quest_id: у карты остаётся id из target, а при
+        # совпадении uid побеждает элемент из более свежей карты.
+        elements_sql = (
+            f"INTO {target}.map_elements ({self.MAP_ELEMENT_COLUMNS}) "
+            f"SELECT t.id, e.uid, e.kind, e.x, e.y, e.text, e.style, e.points "
+            f"FROM {source}.map_elements e "
+            f"JOIN {source}.maps s ON s.id = e.map_id "
+            f"JOIN {target}.maps t ON t.quest_id = s.quest_id "
+            f"WHERE s.quest_id IN ({placeholders})"
+        )
+        with self._conn:
+            self._conn.execute(
+                f"INSERT INTO {target}.maps ({self.MAP_COLUMNS}) "
+                f"SELECT {self.MAP_COLUMNS} FROM {source}.maps WHERE quest_id IN ({placeholders}) "
+                f"AND quest_id NOT IN (SELECT quest_id FROM {target}.maps WHERE quest_id IS NOT NULL)", quest_ids
+            )
+            self._conn.execute(f"INSERT OR REPLACE {elements_sql} AND s.updated_at > t.updated_at", quest_ids)
+            self._conn.execute(f"INSERT OR IGNORE {elements_sql}", quest_ids)
+            self._conn.execute(
+                f"UPDATE {target}.maps SET "
+                f"background_path = (SELECT s.background_path FROM {source}.maps s WHERE s.quest_id = {target}.maps.quest_id), "
+                f"updated_at = (SELECT s.updated_at FROM {source}.maps s WHERE s.quest_id = {target}.maps.quest_id) "
+                f"WHERE quest_id IN ({placeholders}) AND updated_at < "
+                f"(SELECT s.updated_at FROM {source}.maps s WHERE s.quest_id = {target}.maps.quest_id)", quest_ids
+            )
+            self._conn.execute(f"DELETE FROM {source}.map_elements WHERE map_id IN ({map_ids})", quest_ids)
+            self._conn.execute(f"DELETE FROM {source}.maps WHERE quest_id IN ({placeholders})", quest_ids)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {target}.quests ({self.QUEST_COLUMNS}) "
+                f"SELECT {self.QUEST_COLUMNS} FROM {source}.quests WHERE id IN ({placeholders})", quest_ids
+            )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {target}.quest_versions ({self.VERSION_COLUMNS}) "
+                f"SELECT {self.VERSION_COLUMNS} FROM {source}.quest_versions WHERE quest_id IN ({placeholders})", quest_ids
+            )
+            self._conn.execute(f"DELETE FROM {source}.quest_versions WHERE quest_id IN ({placeholders})", quest_ids)
+            self._conn.execute(f"DELETE FROM {source}.quests WHERE id IN ({placeholders})", quest_ids)
+
+    def archive_quests(self, max_age_days: int | None = None, include_expired: bool = True, compact: bool = False) -> int:
+        """Переносит просроченные и старые квесты вместе с версиями в архив пачками."""
+        max_age_days = self.ARCHIVE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        conditions = ["created_at < datetime('now', ?)"]
+        params: List[Any] = [f"-{max_age_days} days"]
+        if include_expired:
+            conditions.append("(deadline IS NOT NULL AND deadline < strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime'))")
+        select_sql = f"SELECT id FROM main.quests WHERE {' OR '.join(conditions)} LIMIT ?"
+        
+        moved = 0
+        with metrics.span("db.archive_quests"):
+            while True:
+                self._cursor.execute(select_sql, params + [self.ARCHIVE_BATCH_SIZE])
+                quest_ids = [row[0] for row in self._cursor.fetchall()]
+                if not quest_ids:
+                    break
+                self._move_quests("main", "archive", quest_ids)
+                moved += len(quest_ids)
+        
+        if compact and moved:
+            self._conn.execute("VACUUM main")
+        
+        metrics.incr("db.quests_archived", moved)
+        return moved
+
+    def restore_quest(self, quest_id: int) -> bool:
+        self._cursor.execute("SELECT 1 FROM archive.quests WHERE id = ?", (quest_id,))
+        if not self._cursor.fetchone():
+            return False
+        self._move_quests("archive", "main", [quest_id])
+        return True
+
+    def rebuild_statistics(self):
+        """Полный пересчёт сводных таблиц. Нужен один раз для базы, созданной до их появления."""
+        with metrics.span("db.rebuild_statistics"):
+            with self._conn:
+                self._conn.executescript("""
+                    DELETE FROM stats_by_difficulty;
+                    DELETE FROM stats_deadline_days;
+                    DELETE FROM stats_version_counts;
+                    DELETE FROM stats_totals;
+
+                    INSERT INTO stats_by_difficulty (difficulty, quest_count, reward_sum)
+                    SELECT COALESCE(difficulty, ''), COUNT(*), COALESCE(SUM(reward), 0)
+                    FROM main.quests GROUP BY COALESCE(difficulty, '');
+
+                    INSERT INTO stats_deadline_days (day, quest_count)
+                    SELECT substr(deadline, 1, 10), COUNT(*)
+                    FROM main.quests WHERE deadline IS NOT NULL GROUP BY substr(deadline, 1, 10);
+
+                    INSERT INTO stats_version_counts (quest_id, version_count)
+                    SELECT quest_id, COUNT(*) FROM main.quest_versions GROUP BY quest_id;
+
+                    INSERT INTO stats_totals (id, version_count)
+                    SELECT 1, COUNT(*) FROM main.quest_versions;
+                """)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Сводка по рабочей (не архивной) базе; читает только сводные таблицы."""
+        with metrics.span("db.get_statistics"):
+            self._cursor.execute(
+                "SELECT difficulty, quest_count, reward_sum FROM stats_by_difficulty WHERE quest_count > 0"
+            )
+            by_difficulty = {
+                difficulty: {'quest_count': count, 'reward_sum': reward_sum}
+                for difficulty, count, reward_sum in self._cursor.fetchall()
+            }
+            
+            self._cursor.execute(
+                "SELECT COALESCE(SUM(quest_count), 0) FROM stats_deadline_days "
+                "WHERE day BETWEEN date('now', 'localtime') AND date('now', 'localtime', '+6 days')"
+            )
+            due_this_week = self._cursor.fetchone()[0]
+            
+            self._cursor.execute("SELECT version_count FROM stats_totals WHERE id = 1")
+            row = self._cursor.fetchone()
+            total_versions = row[0] if row else 0
+        
+        total_quests = sum(stats['quest_count'] for stats in by_difficulty.values())
+        return {
+            'by_difficulty': by_difficulty,
+            'total_quests': total_quests,
+            'total_reward': sum(stats['reward_sum'] for stats in by_difficulty.values()),
+            'due_this_week': due_this_week,
+            'total_versions': total_versions,
+            'avg_versions_per_quest': total_versions / total_quests if total_quests else 0.0,
+        }
+
+    def get_version_count(self, quest_id: int) -> int:
+        self._cursor.execute("SELECT version_count FROM stats_version_counts WHERE quest_id = ?", (quest_id,))
+        row = self._cursor.fetchone()
+        return row[0] if row else 0
+
+    def get_import_job(self, source: str) -> Dict[str, Any] | None:
+        self._cursor.execute("SELECT * FROM import_jobs WHERE source = ?", (source,))
+        row = self._cursor.fetchone()
+        if row:
+            cols = [col[0] for col in self._cursor.description]
+            return dict(zip(cols, row))
+        return None
+
+    def reset_import_job(self, source: str, file_size: int, file_mtime: int):
+        self._cursor.execute(
+            "INSERT OR REPLACE INTO import_jobs (source, file_size, file_mtime) VALUES (?, ?, ?)",
+            (source, file_size, file_mtime)
+        )
+        self._conn.commit()
+
+    def import_quest_chunk(self, quests: List[Dict[str, Any]], source: str, rows_done: int, rejected: int):
+        """Вставляет пачку квестов с версиями и сдвигает контрольную точку импорта в одной транзакции."""
+        quest_sql = f"INSERT INTO quests ({', '.join(self.QUEST_FIELDS)}) VALUES ({', '.join('?' * len(self.QUEST_FIELDS))})"
+        version_sql = "INSERT INTO quest_versions (quest_id, title, difficulty, reward, description) VALUES (?, ?, ?, ?, ?)"
+        
+        with metrics.span("db.import_quest_chunk"):
+            with self._conn:
+                cursor = self._conn.cursor()
+                versions = []
+                for quest in quests:
+                    cursor.execute(quest_sql, [quest[f] for f in self.QUEST_FIELDS])
+                    versions.append((cursor.lastrowid, quest['title'], quest['difficulty'], quest['reward'], quest['description']))
+                cursor.executemany(version_sql, versions)
+                cursor.execute(
+                    "UPDATE import_jobs SET rows_done = ?, imported = imported + ?, rejected = rejected + ?, "
+                    "updated_at = CURRENT_TIMESTAMP WHERE source = ?",
+                    (rows_done, len(quests), rejected, source)
+                )
+
+    MAP_ELEMENT_FIELDS = ('uid', 'kind', 'x', 'y', 'text', 'style', 'points')
+
+    def get_map(self, quest_id: int) -> Dict[str, Any] | None:
+        with metrics.span("db.get_map"):
+            self._cursor.execute("SELECT id, background_path FROM maps WHERE quest_id = ?", (quest_id,))
+            row = self._cursor.fetchone()
+            if not row:
+                return None
+            
+            map_id, background_path = row
+            self._cursor.execute(
+                "SELECT uid, kind, x, y, text, style, points FROM map_elements WHERE map_id = ?",
+                (map_id,)
+            )
+            elements = [dict(zip(self.MAP_ELEMENT_FIELDS, r)) for r in self._cursor.fetchall()]
+        return {'id': map_id, 'quest_id': quest_id, 'background_path': background_path, 'elements': elements}
+
+    def save_map_changes(self, quest_id: int, background_path: str | None,
+                         upserts: List[Dict[str, Any]], deleted_uids: List[str]) -> int:
+        with metrics.span("db.save_map_changes"):
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO maps (quest_id, background_path) VALUES (?, ?) "
+                    "ON CONFLICT(quest_id) DO UPDATE SET background_path = excluded.background_path, "
+                    "updated_at = CURRENT_TIMESTAMP",
+                    (quest_id, background_path)
+                )
+                map_id = self._conn.execute("SELECT id FROM maps WHERE quest_id = ?", (quest_id,)).fetchone()[0]
+                
+                if deleted_uids:
+                    self._conn.executemany(
+                        "DELETE FROM map_elements WHERE map_id = ? AND uid = ?",
+                        [(map_id, uid) for uid in deleted_uids]
+                    )
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO map_elements (map_id, uid, kind, x, y, text, style, points) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(map_id, *(e.get(f) for f in self.MAP_ELEMENT_FIELDS)) for e in upserts]
+                    )
+        metrics.incr("db.map_elements_written", len(upserts))
+        return map_id
+
+    def append_xp_grants(self, grants: List[Tuple[str, int]], event_counts: Dict[str, int] | None = None):
+        if not grants and not event_counts:
+            return
+        
+        with metrics.span("db.append_xp_grants"):
+            with self._conn:
+                if grants:
+                    self._conn.executemany("INSERT INTO xp_ledger (action_key, xp) VALUES (?, ?)", grants)
+                    self._conn.execute(
+                        "UPDATE xp_totals SET total_xp = total_xp + ? WHERE id = 1",
+                        (sum(xp for _, xp in grants),)
+                    )
+                if event_counts:
+                    self._conn.executemany(
+                        "INSERT INTO event_counters (event, total) VALUES (?, ?) "
+                        "ON CONFLICT(event) DO UPDATE SET total = total + excluded.total",
+                        list(event_counts.items())
+                    )
+
+    def get_event_counters(self) -> Dict[str, int]:
+        self._cursor.execute("SELECT event, total FROM event_counters")
+        return dict(self._cursor.fetchall())
+
+    def get_xp_total(self) -> int:
+        self._cursor.execute("SELECT total_xp FROM xp_totals WHERE id = 1")
+        row = self._cursor.fetchone()
+        return row[0] if row else 0
+
+    def add_achievement(self, name: str):
+        self._cursor.execute("INSERT OR IGNORE INTO achievements (name) VALUES (?)", (name,))
+        self._conn.commit()
+
+    def get_achievements(self) -> List[str]:
+        self._cursor.execute("SELECT name FROM achievements ORDER BY unlocked_at")
+        return [row[0] for row in self._cursor.fetchall()]
+
+db_manager = LazyInstance(DatabaseManager)
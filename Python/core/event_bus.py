@@ -0,0 +1,27 @@
+import threading
+from typing import Any, Callable, Dict, List
+
+class EventBus:
+    """Простая шина publish/subscribe для событий XP, уровней и достижений."""
+
+    XP_CHANGED = "xp_changed"
+    LEVEL_CHANGED = "level_changed"
+    ACHIEVEMENT_UNLOCKED = "achievement_unlocked"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+
+    def subscribe(self, topic: str, callback: Callable[[Any], None]):
+        with self._lock:
+            # Копия при записи: publish читает список без блокировки.
+            self._subscribers[topic] = self._subscribers.get(topic, []) + [callback]
+
+    def publish(self, topic: str, payload: Any = None):
+        for callback in self._subscribers.get(topic, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"❌ Ошибка обработчика события '{topic}': {e}")
+
+event_bus = EventBus()
@@ -1,13 +1,20 @@
-from typing import Dict, Tuple
+import atexit
+from bisect import bisect_right
+from typing import Dict, Tuple, List, Any
+
+from core.database import db_manager
+from core.achievements import AchievementIndex
+from core.event_bus import event_bus, EventBus
+from core.lazy import LazyInstance
 
 class GamificationEngine:
-    
+
     LEVELS: Dict[str, int] = {
         "Ученик": 0,
         "Мастер пергаментов": 50,
         "Архимаг документов": 100
     }
-    
+
     XP_MAP: Dict[str, int] = {
         "CREATE_QUEST": 3,
         "EXPORT_PDF": 2,
@@ -16,57 +23,104 @@ class GamificationEngine:
         "BOSS_FIGHT": 20
     }
 
+    ACHIEVEMENTS: List[Dict[str, Any]] = [
+        # CREATE_QUEST начисляется и за каждое автосохранение, поэтому счётные правила
+        # смотрят на QUEST_CREATED — только реально созданные квесты.
+        {'name': "Первая Книжная Сотня", 'event': "BOSS_FIGHT_QUESTS", 'min_value': 10},
+        {'name': "Босс-Файт Покорен", 'event': "BOSS_FIGHT", 'max_value': 5.0, 'reward_action': "BOSS_FIGHT"},
+        {'name': "Вдохновение Писаря", 'event': "QUEST_CREATED", 'count': 5, 'window_sec': 60},
+        {'name': "Летописец", 'event': "QUEST_CREATED", 'count': 1000},
+        {'name': "Картограф", 'event': "SAVE_MAP", 'count': 5},
+        {'name': "Печатный Двор", 'event': "EXPORT_PDF", 'count': 10},
+        {'name': "Канцелярия", 'event': "EXPORT_DOCX", 'count': 10},
+    ]
+
+    MAX_LEVEL_XP = 99999
+    FLUSH_BATCH_SIZE = 20
+
     def __init__(self):
-        self.current_xp: int = 0
-        self.achievements: set[str] = set()
+        self._db = db_manager
+        self._pending_grants: List[Tuple[str, int]] = []
+        self._pending_counts: Dict[str, int] = {}
+
+        levels = sorted(self.LEVELS.items(), key=lambda item: item[1])
+        self._level_names: List[str] = [name for name, _ in levels]
+        self._level_thresholds: List[int] = [xp for _, xp in levels]
+
+        self.current_xp: int = self._db.get_xp_total()
+        self.achievements: set[str] = set(self._db.get_achievements())
+        self._level_index: int = bisect_right(self._level_thresholds, self.current_xp) - 1
+
+        self._rules = AchievementIndex(self.ACHIEVEMENTS, self.achievements, self._db.get_event_counters())
+
+        atexit.register(self.flush)
+
+    def _advance_level(self):
+        # XP только растёт, поэтому уровень сдвигается вперёд за амортизированное O(1).
+        thresholds = self._level_thresholds
+        while self._level_index + 1 < len(thresholds) and thresholds[self._level_index + 1] <= self.current_xp:
+            self._level_index += 1
 
     def get_level_info(self) -> Tuple[str, int, int]:
-        
-        sorted_levels = sorted(self.LEVELS.items(), key=lambda item: item[1], reverse=True)
-        
-        current_level_name = "Новичок"
-        xp_of_current_level = 0
-        
-        for name, xp_required in sorted_levels:
-            if self.current_xp >= xp_required:
-                current_level_name = name
-                xp_of_current_level = xp_required
-                break
-                
-        is_max_level = True
-        next_xp_required = 99999
-        for name, xp_required in sorted_levels:
-             if xp_required > self.current_xp:
-                 is_max_level = False
-                 if xp_required < next_xp_required:
-                     next_xp_required = xp_required
-        
-        xp_to_go = next_xp_required - self.current_xp if not is_max_level else 0
+        index = self._level_index
+
+        current_level_name = self._level_names[index] if index >= 0 else "Новичок"
+
+        if index + 1 < len(self._level_thresholds):
+            next_xp_required = self._level_thresholds[index + 1]
+        else:
+            next_xp_required = self.MAX_LEVEL_XP
 
         return current_level_name, self.current_xp, next_xp_required
 
-    def grant_xp(self, action_key: str):
+    def grant_xp(self, action_key: str, value: float | None = None):
+        self._add_xp(action_key)
+        self.record_event(action_key, value=value)
+
+    def _add_xp(self, action_key: str):
         xp_gained = self.XP_MAP.get(action_key, 0)
-        
+
         if xp_gained > 0:
-            old_level_name, _, _ = self.get_level_info()
+            old_level_index = self._level_index
             self.current_xp += xp_gained
-            new_level_name, _, _ = self.get_level_info()
-            
+            self._advance_level()
+
+            self._pending_grants.append((action_key, xp_gained))
+
             print(f"🎉 Получено {xp_gained} XP за '{action_key}'. Всего XP: {self.current_xp}")
-            
-            if new_level_name != old_level_name:
+            event_bus.publish(EventBus.XP_CHANGED, self.current_xp)
+
+            if self._level_index != old_level_index:
+                new_level_name, _, _ = self.get_level_info()
                 print(f"⬆️ ПОЗДРАВЛЯЕМ! Вы достигли уровня: {new_level_name}!")
-            
-    def check_achievements(self, total_quests: int, boss_fight_time: float = -1):
-        
-        if total_quests >= 10 and "Первая Книжная Сотня" not in self.achievements:
-            self.achievements.add("Первая Книжная Сотня")
-            print("🏆 ДОСТИЖЕНИЕ: Первая Книжная Сотня!")
-
-        if boss_fight_time != -1 and boss_fight_time < 5.0 and "Босс-Файт Покорен" not in self.achievements:
-            self.achievements.add("Босс-Файт Покорен")
-            self.grant_xp("BOSS_FIGHT") 
-            print(f"👑 ДОСТИЖЕНИЕ: Босс-Файт Покорен за {boss_fight_time:.2f} сек!")
-
-gamification_engine = GamificationEngine()
+                event_bus.publish(EventBus.LEVEL_CHANGED, new_level_name)
+
+    def record_event(self, event: str, amount: int = 1, value: float | None = None):
+        """Учитывает событие без начисления XP и проверяет подписанные на него правила."""
+        self._pending_counts[event] = self._pending_counts.get(event, 0) + amount
+
+        for rule in self._rules.process(event, amount, value):
+            self._unlock_achievement(rule)
+
+        if len(self._pending_grants) + len(self._pending_counts) >= self.FLUSH_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_grants and not self._pending_counts:
+            return
+        grants, self._pending_grants = self._pending_grants, []
+        counts, self._pending_counts = self._pending_counts, {}
+        self._db.append_xp_grants(grants, counts)
+
+    def _unlock_achievement(self, rule: Dict[str, Any]):
+        name = rule['name']
+        self.achievements.add(name)
+        self._db.add_achievement(name)
+        print(f"🏆 ДОСТИЖЕНИЕ: {name}!")
+        event_bus.publish(EventBus.ACHIEVEMENT_UNLOCKED, name)
+
+        # Награда — только XP: повторный учёт события исказил бы счётчики правил.
+        if rule.get('reward_action'):
+            self._add_xp(rule['reward_action'])
+
+gamification_engine = LazyInstance(GamificationEngine)
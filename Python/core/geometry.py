@@ -0,0 +1,54 @@
+import sys
+from array import array
+from typing import List, Tuple
+
+Point = Tuple[float, float]
+
+def _segment_distance_sq(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if dx == 0 and dy == 0:
+        return (p[0] - a[0]) ** 2 + (p[1] - a[1]) ** 2
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    px, py = a[0] + t * dx, a[1] + t * dy
+    return (p[0] - px) ** 2 + (p[1] - py) ** 2
+
+def simplify_points(points: List[Point], tolerance: float = 1.0) -> List[Point]:
+    """Упрощение ломаной по Дугласу–Пекеру (итеративно, без рекурсии)."""
+    if len(points) < 3:
+        return list(points)
+
+    tolerance_sq = tolerance * tolerance
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_dist_sq = 0.0
+        index = -1
+        for i in range(start + 1, end):
+            dist_sq = _segment_distance_sq(points[i], points[start], points[end])
+            if dist_sq > max_dist_sq:
+                max_dist_sq = dist_sq
+                index = i
+        if index != -1 and max_dist_sq > tolerance_sq:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [p for p, k in zip(points, keep) if k]
+
+def pack_points(points: List[Point]) -> bytes:
+    """Упаковывает точки в компактный массив float32 (x0, y0, x1, y1, ...)."""
+    packed = array('f', [coord for point in points for coord in point])
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_points(blob: bytes) -> List[Point]:
+    packed = array('f')
+    packed.frombytes(blob)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return list(zip(packed[0::2], packed[1::2]))
@@ -0,0 +1,25 @@
+from typing import Any, Callable
+
+class LazyInstance:
+    """Прокси модульного синглтона: объект создаётся при первом обращении, а не при импорте.
+
+    Импорт модуля (в том числе в дочерних процессах spawn) не должен открывать
+    базу или создавать файлы.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+
+    def _get_instance(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            instance = self._factory()
+            object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get_instance(), name, value)
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, Deque
+
+class _Span:
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.record(self._name, (time.perf_counter() - self._start) * 1000.0)
+        return False
+
+class Metrics:
+    """Лёгкие таймеры и счётчики для горячих участков кода."""
+
+    SAMPLE_LIMIT = 1024
+    DUMP_FILE = "quest_master_metrics.json"
+
+    _NULL_SPAN = nullcontext()
+
+    def __init__(self):
+        self.enabled: bool = os.environ.get("QUEST_MASTER_METRICS", "0") == "1"
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._dump_timer: threading.Timer | None = None
+
+    def span(self, name: str):
+        if not self.enabled:
+            return self._NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, elapsed_ms: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.SAMPLE_LIMIT)
+            samples.append(elapsed_ms)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def incr(self, name: str, amount: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    @staticmethod
+    def _percentile(sorted_values: list, fraction: float) -> float:
+        if not sorted_values:
+            return 0.0
+        index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            counts = dict(self._counts)
+            samples = {name: list(values) for name, values in self._samples.items()}
+
+        result = {}
+        for name, count in counts.items():
+            values = sorted(samples.get(name, ()))
+            result[name] = {
+                'count': count,
+                'p50_ms': self._percentile(values, 0.50),
+                'p95_ms': self._percentile(values, 0.95),
+                'max_ms': values[-1] if values else 0.0,
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def dump(self, path: str | None = None):
+        path = path or self.DUMP_FILE
+        payload = {'timestamp': time.time(), 'metrics': self.snapshot()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def start_periodic_dump(self, interval_sec: float = 30.0, path: str | None = None):
+        if not self.enabled or self._dump_timer is not None:
+            return
+
+        def _tick():
+            if self._dump_timer is None:
+                return
+            try:
+                self.dump(path)
+            except OSError as e:
+                print(f"❌ Не удалось сохранить метрики: {e}")
+            self._dump_timer = threading.Timer(interval_sec, _tick)
+            self._dump_timer.daemon = True
+            self._dump_timer.start()
+
+        self._dump_timer = threading.Timer(interval_sec, _tick)
+        self._dump_timer.daemon = True
+        self._dump_timer.start()
+
+    def stop_periodic_dump(self):
+        if self._dump_timer is not None:
+            self._dump_timer.cancel()
+            self._dump_timer = None
+
+metrics = Metrics()
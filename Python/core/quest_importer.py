@@ -0,0 +1,151 @@
+import os
+import csv
+import sys
+import json
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Any, List, Iterator, Tuple, Callable
+
+from core.database import DatabaseManager
+from core.validation import validate_rows
+from core.metrics import metrics
+
+Row = Tuple[int, Dict[str, Any]]
+
+class QuestImporter:
+    """Потоковый импорт квестов из CSV/JSONL с проверкой, пачками и продолжением после сбоя.
+
+    Файл читается построчно, в работе одновременно не больше MAX_IN_FLIGHT пачек,
+    поэтому память не зависит от размера файла. Контрольная точка (число
+    обработанных строк) сохраняется в import_jobs в той же транзакции, что и пачка.
+    """
+
+    CHUNK_SIZE = 2000
+    MAX_IN_FLIGHT = 8
+    # spawn, а не fork: импорт запускается и из многопоточного GUI-процесса.
+    MP_CONTEXT = multiprocessing.get_context("spawn")
+
+    def __init__(self, db_path: str | None = None, workers: int | None = None,
+                 progress: Callable[[Dict[str, int]], None] | None = None):
+        self.db_path = db_path
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.progress = progress
+        self.stop_event = threading.Event()
+
+    @staticmethod
+    def errors_path(path: str) -> str:
+        return f"{path}.errors.jsonl"
+
+    @staticmethod
+    def _read_rows(path: str) -> Iterator[Row]:
+        if path.lower().endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for row_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        data = {'_raw': line.rstrip('\n'), '_error': f"JSON: {e.msg}"}
+                    if not isinstance(data, dict):
+                        data = {'_raw': line.rstrip('\n'), '_error': "JSON: ожидался объект"}
+                    yield row_number, data
+        else:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                for row_number, data in enumerate(csv.DictReader(f), start=1):
+                    yield row_number, data
+
+    def _chunks(self, rows: Iterator[Row]) -> Iterator[List[Row]]:
+        while True:
+            chunk = list(islice(rows, self.CHUNK_SIZE))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, path: str) -> Dict[str, int]:
+        db = DatabaseManager(self.db_path)
+        source = os.path.abspath(path)
+        stat = os.stat(path)
+
+        job = db.get_import_job(source)
+        resuming = bool(job and job['file_size'] == stat.st_size and job['file_mtime'] == stat.st_mtime_ns)
+        if not resuming:
+            db.reset_import_job(source, stat.st_size, stat.st_mtime_ns)
+            job = db.get_import_job(source)
+
+        rows_done = job['rows_done']
+        stats = {'rows_done': rows_done, 'imported': job['imported'], 'rejected': job['rejected']}
+
+        rows = self._read_rows(path)
+        # Уже закоммиченные строки пропускаются без проверки.
+        if sum(1 for _ in islice(rows, rows_done)) < rows_done:
+            return stats
+
+        error_mode = 'a' if resuming else 'w'
+        with open(self.errors_path(path), error_mode, encoding='utf-8') as errors_file, \
+                ProcessPoolExecutor(max_workers=self.workers, mp_context=self.MP_CONTEXT) as pool:
+            in_flight = deque()
+            chunks = self._chunks(rows)
+
+            def submit_next() -> bool:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return False
+                in_flight.append((len(chunk), pool.submit(validate_rows, chunk)))
+                return True
+
+            while len(in_flight) < self.MAX_IN_FLIGHT and submit_next():
+                pass
+
+            while in_flight and not self.stop_event.is_set():
+                chunk_len, future = in_flight.popleft()
+                with metrics.span("import.validate_wait"):
+                    accepted, rejected = future.result()
+
+                stats['rows_done'] += chunk_len
+                db.import_quest_chunk(accepted, source, stats['rows_done'], len(rejected))
+                stats['imported'] += len(accepted)
+                stats['rejected'] += len(rejected)
+
+                for item in rejected:
+                    errors_file.write(json.dumps(item, ensure_ascii=False) + "\n")
+                errors_file.flush()
+
+                if self.progress:
+                    self.progress(dict(stats))
+                submit_next()
+
+            for _, future in in_flight:
+                future.cancel()
+
+        return stats
+
+    def stop(self):
+        self.stop_event.set()
+
+def main(argv: List[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Массовый импорт квестов из CSV/JSONL.")
+    parser.add_argument("path", help="Файл .csv или .jsonl")
+    parser.add_argument("--db", default=None, help="Путь к базе (по умолчанию quest_master.db)")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов проверки")
+    args = parser.parse_args(argv)
+
+    def report(stats: Dict[str, int]):
+        print(f"📥 Строк: {stats['rows_done']}, импортировано: {stats['imported']}, отклонено: {stats['rejected']}", end="\r")
+
+    importer = QuestImporter(args.db, args.workers, report)
+    try:
+        stats = importer.run(args.path)
+    except KeyboardInterrupt:
+        print("\n⏸️ Импорт прерван, его можно продолжить повторным запуском.")
+        return 1
+    print(f"\n✅ Импорт завершен: {stats['imported']} квестов, отклонено {stats['rejected']} "
+          f"(см. {QuestImporter.errors_path(args.path)})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
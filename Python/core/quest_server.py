@@ -0,0 +1,285 @@
+import os
+import sys
+import json
+import queue
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from core.database import DatabaseManager
+from core.metrics import metrics
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+def _render(fmt: str, template_name: str, quest: Dict[str, Any]) -> bytes:
+    # Jinja2 и WeasyPrint нужны только процессам рендеринга, не серверу.
+    from core.template_engine import template_engine
+    if fmt == 'pdf':
+        return template_engine.render_pdf(template_name, quest)
+    return template_engine.render_html(template_name, quest).encode('utf-8')
+
+class QuestServer:
+    """Локальный HTTP-сервер страниц квестов, на которые ведут QR-коды.
+
+    GET /quest/{id}[.html|.pdf|.json][?template=guild.html]
+
+    Запросы к базе идут через пул соединений только для чтения, рендеринг —
+    в пуле процессов. Готовые страницы лежат в LRU-кэше по ETag, который
+    считается от данных квеста, формата, шаблона и даты, поэтому повторный
+    запрос с If-None-Match получает 304 без рендеринга.
+    """
+
+    FORMATS = {
+        'html': "text/html; charset=utf-8",
+        'pdf': "application/pdf",
+        'json': "application/json; charset=utf-8",
+    }
+    DEFAULT_TEMPLATE = "royal.html"
+    RENDER_CACHE_SIZE = 256
+    KEEPALIVE_TIMEOUT = 15.0
+    MAX_HEADERS = 100
+    MP_CONTEXT = multiprocessing.get_context("spawn")
+
+    def __init__(self, db_path: str | None = None, host: str = "127.0.0.1", port: int = 8765,
+                 db_connections: int = 4, render_workers: int | None = None):
+        self.db_path = db_path or DatabaseManager.DB_NAME
+        self.host = host
+        self.port = port
+        self.db_connections = db_connections
+        self.render_workers = render_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.templates = {name for name in os.listdir(TEMPLATE_DIR) if name.endswith('.html')}
+
+        self._db_pool: queue.Queue = queue.Queue()
+        self._db_executor: ThreadPoolExecutor | None = None
+        self._render_executor: ProcessPoolExecutor | None = None
+        self._render_cache: OrderedDict[str, bytes] = OrderedDict()
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"База не найдена: {self.db_path}")
+        for _ in range(self.db_connections):
+            self._db_pool.put(DatabaseManager(self.db_path, read_only=True))
+        self._db_executor = ThreadPoolExecutor(max_workers=self.db_connections)
+        self._render_executor = ProcessPoolExecutor(max_workers=self.render_workers, mp_context=self.MP_CONTEXT)
+
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._db_executor is not None:
+            self._db_executor.shutdown(wait=True)
+        if self._render_executor is not None:
+            self._render_executor.shutdown(wait=True, cancel_futures=True)
+        while not self._db_pool.empty():
+            self._db_pool.get_nowait()._conn.close()
+
+    def _fetch_quest(self, quest_id: int) -> Dict[str, Any] | None:
+        db = self._db_pool.get()
+        try:
+            return db.get_quest(quest_id, include_archive=True)
+        finally:
+            self._db_pool.put(db)
+
+    @staticmethod
+    def _etag(quest: Dict[str, Any], fmt: str, template_name: str) -> str:
+        # Дата входит в ключ: шаблоны печатают current_date.
+        qr_base_url = os.environ.get("QUEST_MASTER_QR_BASE_URL", "")
+        key = json.dumps([quest, fmt, template_name, date.today().isoformat(), qr_base_url],
+                         sort_keys=True, ensure_ascii=False)
+        return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+    @staticmethod
+    def _etag_matches(header: str | None, etag: str) -> bool:
+        if not header:
+            return False
+        candidates = [tag.strip() for tag in header.split(',')]
+        return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    async def _rendered(self, etag: str, fmt: str, template_name: str, quest: Dict[str, Any]) -> bytes:
+        body = self._render_cache.get(etag)
+        if body is not None:
+            self._render_cache.move_to_end(etag)
+            metrics.incr("server.render_cache_hit")
+            return body
+
+        # Одновременные запросы одной страницы ждут один и тот же рендер.
+        pending = self._rendering.get(etag)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(self._render_executor, _render, fmt, template_name, quest)
+        self._rendering[etag] = pending
+        try:
+            with metrics.span(f"server.render_{fmt}"):
+                body = await asyncio.shield(pending)
+        finally:
+            self._rendering.pop(etag, None)
+
+        self._render_cache[etag] = body
+        if len(self._render_cache) > self.RENDER_CACHE_SIZE:
+            self._render_cache.popitem(last=False)
+        return body
+
+    @staticmethod
+    def _error(status: HTTPStatus, message: str | None = None) -> Response:
+        body = (message or status.phrase).encode('utf-8')
+        return status, {'Content-Type': "text/plain; charset=utf-8"}, body
+
+    async def handle_request(self, method: str, target: str, headers: Dict[str, str]) -> Response:
+        if method not in ('GET', 'HEAD'):
+            status, response_headers, body = self._error(HTTPStatus.METHOD_NOT_ALLOWED)
+            response_headers['Allow'] = "GET, HEAD"
+            return status, response_headers, body
+
+        url = urlsplit(target)
+        parts = url.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'quest':
+            return self._error(HTTPStatus.NOT_FOUND)
+
+        query = parse_qs(url.query)
+        quest_part, _, extension = parts[1].partition('.')
+        fmt = extension or query.get('format', ['html'])[0]
+        template_name = query.get('template', [self.DEFAULT_TEMPLATE])[0]
+        if not quest_part.isdigit():
+            return self._error(HTTPStatus.NOT_FOUND)
+        if fmt not in self.FORMATS:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Неизвестный формат: {fmt}")
+        if template_name not in self.templates:
+            return self._error(HTTPStatus.BAD_REQUEST, f"Неизвестный шаблон: {template_name}")
+
+        loop = asyncio.get_running_loop()
+        quest = await loop.run_in_executor(self._db_executor, self._fetch_quest, int(quest_part))
+        if quest is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"Квест #{quest_part} не найден")
+
+        etag = self._etag(quest, fmt, template_name)
+        response_headers = {'ETag': etag, 'Cache-Control': "no-cache"}
+        if self._etag_matches(headers.get('if-none-match'), etag):
+            metrics.incr("server.not_modified")
+            return HTTPStatus.NOT_MODIFIED, response_headers, b''
+
+        if fmt == 'json':
+            body = json.dumps(quest, ensure_ascii=False).encode('utf-8')
+        else:
+            body = await self._rendered(etag, fmt, template_name, quest)
+        response_headers['Content-Type'] = self.FORMATS[fmt]
+        return HTTPStatus.OK, response_headers, body
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, str, Dict[str, str]] | None:
+        request_line = await asyncio.wait_for(reader.readline(), self.KEEPALIVE_TIMEOUT)
+        if not request_line:
+            return None
+        method, target, version = request_line.decode('latin-1').split()
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= self.MAX_HEADERS:
+                raise ValueError("слишком много заголовков")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Тело у GET/HEAD не ожидается, но его нужно вычитать, чтобы не сбить следующий запрос.
+        length = int(headers.get('content-length', 0) or 0)
+        if length:
+            await reader.readexactly(length)
+        return method, target, version, headers
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError:
+                    await self._write_response(writer, 'GET', self._error(HTTPStatus.BAD_REQUEST), False)
+                    break
+                if request is None:
+                    break
+
+                method, target, version, headers = request
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+                with metrics.span("server.request"):
+                    try:
+                        response = await self.handle_request(method, target, headers)
+                    except Exception as e:
+                        print(f"Ошибка сервера квестов ({target}): {e}")
+                        response = self._error(HTTPStatus.INTERNAL_SERVER_ERROR)
+                await self._write_response(writer, method, response, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, method: str, response: Response, keep_alive: bool):
+        status, headers, body = response
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        headers['Content-Length'] = str(len(body))
+        headers['Connection'] = "keep-alive" if keep_alive else "close"
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        if method != 'HEAD' and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(body)
+        await writer.drain()
+
+def main(argv: List[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Локальный сервер страниц квестов для QR-ссылок.")
+    parser.add_argument("--db", default=None, help="Путь к базе (по умолчанию quest_master.db)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db-connections", type=int, default=4, help="Размер пула соединений с базой")
+    parser.add_argument("--render-workers", type=int, default=None, help="Число процессов рендеринга")
+    args = parser.parse_args(argv)
+
+    server = QuestServer(args.db, args.host, args.port, args.db_connections, args.render_workers)
+
+    async def run():
+        await server.start()
+        print(f"🌐 Сервер квестов: http://{server.host}:{server.port}/quest/<id> "
+              f"(для QR-кодов задайте QUEST_MASTER_QR_BASE_URL=http://{server.host}:{server.port})")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n⏹️ Сервер остановлен.")
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -9,39 +9,58 @@ from docx import Document
 from qrcode import make as make_qrcode
 from qrcode.image.pil import PilImage
 
+from core.metrics import metrics
+
 class TemplateEngine:
     
+    # Адрес, который попадает в QR-код; для локального сервера квестов
+    # (core/quest_server.py) задаётся через QUEST_MASTER_QR_BASE_URL.
+    QR_BASE_URL = os.environ.get("QUEST_MASTER_QR_BASE_URL", "https://adventurers-guild.com").rstrip("/")
+
     def __init__(self):
         template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
         self.env = Environment(loader=FileSystemLoader(template_dir))
 
     def _generate_qr_code(self, quest_id: int) -> str:
-        url = f"https://adventurers-guild.com/quest/{quest_id}"
-        img: PilImage = make_qrcode(url, image_factory=PilImage)
+        url = f"{self.QR_BASE_URL}/quest/{quest_id}"
         
         import io
         import base64
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode()
+        with metrics.span("render.qr_code"):
+            img: PilImage = make_qrcode(url, image_factory=PilImage)
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG")
+            return base64.b64encode(buffer.getvalue()).decode()
 
-    def render_html(self, template_name: str, quest_data: Dict[str, Any]) -> str:
-        template = self.env.get_template(template_name)
-        
-        qr_code_base64 = self._generate_qr_code(quest_data.get('id', -1))
-        
-        context = {
-            'quest': quest_data,
-            'current_date': datetime.now().strftime("%d.%m.%Y"),
-            'qr_code': qr_code_base64
-        }
-        return template.render(context)
-
-    def export_pdf(self, template_name: str, quest_data: Dict[str, Any], output_path: str):
-        html_content = self.render_html(template_name, quest_data)
-        HTML(string=html_content).write_pdf(output_path)
+    def render_html(self, template_name: str, quest_data: Dict[str, Any], map_image: str | None = None) -> str:
+        with metrics.span("render.html"):
+            template = self.env.get_template(template_name)
+            
+            qr_code_base64 = self._generate_qr_code(quest_data.get('id', -1))
+            
+            context = {
+                'quest': quest_data,
+                'current_date': datetime.now().strftime("%d.%m.%Y"),
+                'qr_code': qr_code_base64,
+                'map_image': map_image
+            }
+            return template.render(context)
+
+    def export_pdf(self, template_name: str, quest_data: Dict[str, Any], output_path: str, map_image: str | None = None):
+        html_content = self.render_html(template_name, quest_data, map_image)
+        with metrics.span("export.pdf"):
+            HTML(string=html_content).write_pdf(output_path)
+
+    def render_pdf(self, template_name: str, quest_data: Dict[str, Any], map_image: str | None = None) -> bytes:
+        html_content = self.render_html(template_name, quest_data, map_image)
+        with metrics.span("render.pdf"):
+            return HTML(string=html_content).write_pdf()
         
     def export_docx(self, quest_data: Dict[str, Any], output_path: str):
+        with metrics.span("export.docx"):
+            self._write_docx(quest_data, output_path)
+
+    def _write_docx(self, quest_data: Dict[str, Any], output_path: str):
         doc = Document()
         doc.add_heading(f"Контракт Гильдии Приключенцев #{quest_data.get('id', 'N/A')}", 0)
         
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+
+# Единые правила для формы QuestWizard, импорта и схемы таблицы quests.
+DIFFICULTY_OPTIONS = ['Легкий', 'Средний', 'Сложный', 'Эпический']
+TITLE_MAX_LENGTH = 50
+REWARD_MIN = 10
+REWARD_MAX = 10000
+DESCRIPTION_MIN_LENGTH = 50
+DEADLINE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def validate_quest(raw: Dict[str, Any]) -> Tuple[Dict[str, Any] | None, List[str]]:
+    """Проверяет и нормализует квест. Возвращает (данные, []) или (None, ошибки)."""
+    errors = []
+
+    title = str(raw.get('title') or '').strip()
+    if not title:
+        errors.append("title: пустое название")
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors.append(f"title: длиннее {TITLE_MAX_LENGTH} символов")
+
+    difficulty = str(raw.get('difficulty') or '').strip()
+    if difficulty not in DIFFICULTY_OPTIONS:
+        errors.append(f"difficulty: недопустимое значение '{difficulty}'")
+
+    reward = None
+    try:
+        reward_value = float(str(raw.get('reward', '')).strip())
+        if not reward_value.is_integer():
+            raise ValueError
+        reward = int(reward_value)
+        if not REWARD_MIN <= reward <= REWARD_MAX:
+            errors.append(f"reward: вне диапазона {REWARD_MIN}–{REWARD_MAX}")
+    except ValueError:
+        errors.append("reward: не целое число")
+
+    description = str(raw.get('description') or '').strip()
+    if len(description) < DESCRIPTION_MIN_LENGTH:
+        errors.append(f"description: короче {DESCRIPTION_MIN_LENGTH} символов")
+
+    deadline = None
+    try:
+        parsed = datetime.fromisoformat(str(raw.get('deadline') or '').strip())
+        deadline = parsed.strftime(DEADLINE_FORMAT)
+    except ValueError:
+        errors.append("deadline: не дата ISO 8601")
+
+    if errors:
+        return None, errors
+
+    return {
+        'title': title,
+        'difficulty': difficulty,
+        'reward': reward,
+        'description': description,
+        'deadline': deadline,
+    }, []
+
+def validate_rows(rows: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Проверяет пачку (номер строки, данные) для импорта. Выполняется в процессах-рабочих,
+    поэтому модуль не должен иметь побочных эффектов при импорте."""
+    accepted, rejected = [], []
+    for row_number, raw in rows:
+        if '_error' in raw:
+            rejected.append({'row': row_number, 'errors': [raw['_error']], 'data': raw})
+            continue
+        quest, errors = validate_quest(raw)
+        if errors:
+            rejected.append({'row': row_number, 'errors': errors, 'data': raw})
+        else:
+            accepted.append(quest)
+    return accepted, rejected
@@ -0,0 +1,23 @@
+import sqlite3
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.database import DatabaseManager
+
+class ArchiveWorker(QThread):
+    """Переносит старые квесты в архив и сжимает базу вне GUI-потока, через своё соединение."""
+
+    finished_archive = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path: str, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+
+    def run(self):
+        try:
+            db = DatabaseManager(self.db_path)
+            try:
+                self.finished_archive.emit(db.archive_quests(compact=True))
+            finally:
+                db._conn.close()
+        except sqlite3.Error as e:
+            self.failed.emit(str(e))
@@ -0,0 +1,218 @@
+import os
+import json
+import math
+import uuid
+import shutil
+import hashlib
+from typing import Dict, Any
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+from core.metrics import metrics
+
+class _TaskSignals(QObject):
+    pyramid_ready = pyqtSignal(str, object)
+    level_loaded = pyqtSignal(str, int, QImage)
+    failed = pyqtSignal(str, str)
+
+class _BuildPyramidTask(QRunnable):
+
+    def __init__(self, loader: 'BackgroundLoader', path: str):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+
+    def run(self):
+        try:
+            with metrics.span("map.background.pyramid"):
+                meta = self.loader.build_pyramid(self.path)
+            self.loader.signals.pyramid_ready.emit(self.path, meta)
+        except (OSError, ValueError) as e:
+            self.loader.signals.failed.emit(self.path, str(e))
+
+class _LoadLevelTask(QRunnable):
+
+    def __init__(self, loader: 'BackgroundLoader', path: str, level: Dict[str, Any]):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+        self.level = level
+
+    def run(self):
+        with metrics.span("map.background.level"):
+            image = QImage(self.level['file'])
+        if image.isNull():
+            self.loader.signals.failed.emit(self.path, f"Не удалось прочитать уровень {self.level['index']}")
+            return
+        self.loader.signals.level_loaded.emit(self.path, self.level['index'], image)
+
+class BackgroundLoader(QObject):
+    """Декодирует фон карты в фоне и строит mip-пирамиду с кэшем на диске.
+
+    Уровень k — изображение в 2**k раз меньше оригинала. Сохраняются только
+    уровни не крупнее MAX_LEVEL_SIDE, поэтому полноразмерный скан никогда не
+    остаётся в памяти.
+    """
+
+    CACHE_DIR = "map_cache"
+    CACHE_VERSION = 2
+    # Крупные уровни дополнительно режутся на плитки: экспорт читает только нужные.
+    TILE_SIDE = 1024
+    MAX_LEVEL_SIDE = 8192
+    MIN_LEVEL_SIDE = 256
+    ALLOCATION_LIMIT_MB = 1024
+    HASH_CHUNK = 1 << 20
+
+    pyramid_ready = pyqtSignal(str, object)
+    level_loaded = pyqtSignal(str, int, QImage)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        QImageReader.setAllocationLimit(self.ALLOCATION_LIMIT_MB)
+
+        self.signals = _TaskSignals()
+        self.signals.pyramid_ready.connect(self.pyramid_ready)
+        self.signals.level_loaded.connect(self.level_loaded)
+        self.signals.failed.connect(self.failed)
+
+    def load(self, path: str):
+        self.pool.start(_BuildPyramidTask(self, path))
+
+    def request_level(self, path: str, meta: Dict[str, Any], index: int):
+        for level in meta['levels']:
+            if level['index'] == index:
+                self.pool.start(_LoadLevelTask(self, path, level))
+                return
+
+    @staticmethod
+    def pick_level(meta: Dict[str, Any], zoom: float) -> int:
+        levels = meta['levels']
+        finest, coarsest = levels[0]['index'], levels[-1]['index']
+        if zoom >= 1.0:
+            return finest
+        wanted = int(math.floor(math.log2(1.0 / zoom)))
+        return max(finest, min(coarsest, wanted))
+
+    @classmethod
+    def _file_hash(cls, path: str) -> str:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_cached_meta(cache_dir: str) -> Dict[str, Any] | None:
+        try:
+            with open(os.path.join(cache_dir, "meta.json"), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != BackgroundLoader.CACHE_VERSION:
+            return None
+        for level in meta['levels']:
+            if not os.path.exists(level['file']):
+                return None
+            if 'tiles' in level and not os.path.isdir(level['tiles']['dir']):
+                return None
+        return meta
+
+    @staticmethod
+    def tile_path(level: Dict[str, Any], row: int, col: int) -> str:
+        return os.path.join(level['tiles']['dir'], f"{row}_{col}.png")
+
+    @classmethod
+    def build_pyramid(cls, path: str) -> Dict[str, Any]:
+        """Строит пирамиду во временном каталоге и подменяет им map_cache/<hash> целиком.
+
+        Пирамиду одного файла могут строить одновременно редактор и экспорт:
+        читатель видит либо готовый каталог, либо никакой.
+        """
+        cache_dir = os.path.join(cls.CACHE_DIR, cls._file_hash(path))
+
+        meta = cls._read_cached_meta(cache_dir)
+        if meta is not None:
+            metrics.incr("map.background.cache_hit")
+            return meta
+
+        reader = QImageReader(path)
+        size = reader.size()
+        if not size.isValid():
+            raise ValueError(f"Неизвестный формат изображения: {reader.errorString()}")
+
+        width, height = size.width(), size.height()
+        index = 0
+        while max(width, height) / (2 ** index) > cls.MAX_LEVEL_SIDE:
+            index += 1
+
+        # Для JPEG декодер сразу читает уменьшенную копию, не распаковывая оригинал.
+        reader.setScaledSize(QSize(math.ceil(width / 2 ** index), math.ceil(height / 2 ** index)))
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f"Не удалось декодировать изображение: {reader.errorString()}")
+
+        tmp_dir = f"{cache_dir}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_dir)
+        try:
+            meta = cls._write_levels(image, index, width, height, cache_dir, tmp_dir)
+            finished = cls._read_cached_meta(cache_dir)
+            if finished is not None:
+                return finished
+            if os.path.isdir(cache_dir):
+                # Неполный каталог, оставшийся от прерванной записи на месте.
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            os.replace(tmp_dir, cache_dir)
+        except OSError:
+            # Параллельный сборщик успел первым — берём его результат.
+            meta = cls._read_cached_meta(cache_dir)
+            if meta is None:
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return meta
+
+    @classmethod
+    def _write_levels(cls, image: QImage, index: int, width: int, height: int,
+                      cache_dir: str, tmp_dir: str) -> Dict[str, Any]:
+        levels = []
+        while True:
+            name = f"level_{index}.png"
+            if not image.save(os.path.join(tmp_dir, name), "PNG"):
+                raise OSError(f"Не удалось записать кэш фона: {name}")
+            # В meta.json — итоговые пути, каталог переименовывается целиком.
+            level = {'index': index, 'width': image.width(), 'height': image.height(),
+                     'file': os.path.join(cache_dir, name)}
+            if max(image.width(), image.height()) > cls.TILE_SIDE:
+                level['tiles'] = cls._write_tiles(image, index, cache_dir, tmp_dir)
+            levels.append(level)
+
+            if max(image.width(), image.height()) <= cls.MIN_LEVEL_SIDE:
+                break
+            image = image.scaled(
+                max(1, image.width() // 2), max(1, image.height() // 2),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            index += 1
+
+        meta = {'version': cls.CACHE_VERSION, 'width': width, 'height': height, 'levels': levels}
+        with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        return meta
+
+    @classmethod
+    def _write_tiles(cls, image: QImage, index: int, cache_dir: str, tmp_dir: str) -> Dict[str, Any]:
+        name = f"level_{index}_tiles"
+        os.makedirs(os.path.join(tmp_dir, name))
+        size = cls.TILE_SIDE
+        rows, columns = math.ceil(image.height() / size), math.ceil(image.width() / size)
+        for row in range(rows):
+            for col in range(columns):
+                x, y = col * size, row * size
+                tile = image.copy(x, y, min(size, image.width() - x), min(size, image.height() - y))
+                tile_file = os.path.join(tmp_dir, name, f"{row}_{col}.png")
+                if not tile.save(tile_file, "PNG"):
+                    raise OSError(f"Не удалось записать плитку фона: {tile_file}")
+        return {'dir': os.path.join(cache_dir, name), 'size': size, 'rows': rows, 'columns': columns}
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import pyqtSignal
 from core.template_engine import template_engine
 from core.gamification import gamification_engine
+from gui.map_exporter import MapExportService
 from typing import Dict, Any
 
 class ExporterPanel(QWidget):
@@ -22,6 +23,12 @@ class ExporterPanel(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._pending_pdf = None
+        
+        self.map_service = MapExportService(self)
+        self.map_service.rendered.connect(self._on_map_rendered)
+        self.map_service.failed.connect(self._on_map_failed)
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -83,14 +90,41 @@ class ExporterPanel(QWidget):
         if not file_path:
             return
 
+        if format == 'pdf' and isinstance(quest_id, int) and quest_id != -1:
+            self._pending_pdf = (quest_id, template_name, dict(self.current_quest_data), file_path)
+            if self.map_service.render_quest_map(quest_id):
+                self.pdf_button.setEnabled(False)
+                return
+            self._pending_pdf = None
+
+        self._write_export(format, template_name, self.current_quest_data, file_path)
+
+    def _on_map_rendered(self, quest_id: int, map_image: str):
+        if not self._pending_pdf or self._pending_pdf[0] != quest_id:
+            return
+        _, template_name, quest_data, file_path = self._pending_pdf
+        self._pending_pdf = None
+        self.pdf_button.setEnabled(True)
+        self._write_export('pdf', template_name, quest_data, file_path, map_image)
+
+    def _on_map_failed(self, message: str):
+        if not self._pending_pdf:
+            return
+        print(f"❌ Не удалось отрисовать карту для PDF: {message}")
+        _, template_name, quest_data, file_path = self._pending_pdf
+        self._pending_pdf = None
+        self.pdf_button.setEnabled(True)
+        self._write_export('pdf', template_name, quest_data, file_path)
+
+    def _write_export(self, format: str, template_name: str, quest_data: Dict[str, Any], file_path: str,
+                      map_image: str | None = None):
+        file_extension = "pdf" if format == 'pdf' else "docx"
         try:
-            from core.gamification import gamification_engine
-            
             if format == 'pdf':
-                template_engine.export_pdf(template_name, self.current_quest_data, file_path)
+                template_engine.export_pdf(template_name, quest_data, file_path, map_image)
                 gamification_engine.grant_xp("EXPORT_PDF")
             elif format == 'docx':
-                template_engine.export_docx(self.current_quest_data, file_path)
+                template_engine.export_docx(quest_data, file_path)
                 gamification_engine.grant_xp("EXPORT_DOCX")
 
             QMessageBox.information(
@@ -3,20 +3,42 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QProgressBar, QLabel, QListWidget, 
     QListWidgetItem
 )
-from PyQt6.QtCore import QUrl
+from PyQt6.QtCore import QUrl, QTimer, pyqtSignal
 from PyQt6.QtMultimedia import QSoundEffect 
 from core.gamification import gamification_engine
+from core.event_bus import event_bus, EventBus
 
 class GamificationPanel(QWidget):
     """UI для отображения XP, уровня и достижений."""
     
+    FRAME_INTERVAL_MS = 16
+    
+    # Публикация может прийти из любого потока: обработчики шины только пересылают
+    # событие этим сигналом, а состояние панели меняется уже в GUI-потоке.
+    _event_received = pyqtSignal(str, object)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._level_changed = False
+        self._pending_achievements: list[str] = []
+        self._shown_achievements: set[str] = set()
+        
         self.sound_effect = QSoundEffect()
         self._init_sound()
         self.setup_ui()
+        
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self.repaint_timer.timeout.connect(self.update_ui)
+        self._event_received.connect(self._on_event)
+        
+        self._pending_achievements.extend(gamification_engine.achievements)
         self.update_ui()
         
+        for topic in (EventBus.XP_CHANGED, EventBus.LEVEL_CHANGED, EventBus.ACHIEVEMENT_UNLOCKED):
+            event_bus.subscribe(topic, lambda payload, topic=topic: self._event_received.emit(topic, payload))
+        
     def _init_sound(self):
         path = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sounds', 'level_up.wav')
         if os.path.exists(path):
@@ -39,15 +61,22 @@ class GamificationPanel(QWidget):
         self.achievement_list = QListWidget()
         main_layout.addWidget(self.achievement_list)
 
-    def update_ui(self):
-        old_level = getattr(self, '_last_level', None)
+    def _on_event(self, topic: str, payload):
+        if topic == EventBus.LEVEL_CHANGED:
+            self._level_changed = True
+        elif topic == EventBus.ACHIEVEMENT_UNLOCKED:
+            self._pending_achievements.append(payload)
         
+        # Серия событий схлопывается в одну перерисовку за кадр.
+        if not self.repaint_timer.isActive():
+            self.repaint_timer.start()
+
+    def update_ui(self):
         current_level_name, current_xp, next_xp = gamification_engine.get_level_info()
-        self._last_level = current_level_name
         
         self.level_label.setText(f"Уровень: **{current_level_name}** (Всего XP: {current_xp})")
         
-        if next_xp == 99999:
+        if next_xp == gamification_engine.MAX_LEVEL_XP:
             self.xp_progress_bar.setRange(0, 1)
             self.xp_progress_bar.setValue(1)
             self.xp_progress_bar.setFormat("МАКСИМУМ")
@@ -57,10 +86,13 @@ class GamificationPanel(QWidget):
             self.xp_progress_bar.setValue(current_xp - base_xp)
             self.xp_progress_bar.setFormat(f"%v / %m XP")
 
-        self.achievement_list.clear()
-        for ach in gamification_engine.achievements:
-            self.achievement_list.addItem(f"✅ {ach}")
+        pending, self._pending_achievements = self._pending_achievements, []
+        for ach in pending:
+            if ach not in self._shown_achievements:
+                self._shown_achievements.add(ach)
+                self.achievement_list.addItem(f"✅ {ach}")
             
-        if old_level and old_level != current_level_name:
+        if self._level_changed:
+            self._level_changed = False
             if not self.sound_effect.source().isEmpty():
                 self.sound_effect.play()
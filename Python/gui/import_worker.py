@@ -0,0 +1,26 @@
+import sqlite3
+from concurrent.futures.process import BrokenProcessPool
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.quest_importer import QuestImporter
+
+class ImportWorker(QThread):
+    """Запускает QuestImporter вне GUI-потока и пересылает прогресс сигналами."""
+
+    progress = pyqtSignal(dict)
+    finished_import = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.importer = QuestImporter(progress=self.progress.emit)
+
+    def run(self):
+        try:
+            self.finished_import.emit(self.importer.run(self.path))
+        except (OSError, ValueError, sqlite3.Error, BrokenProcessPool) as e:
+            # Исключение, вышедшее из run(), оставило бы диалог прогресса открытым.
+            self.failed.emit(str(e) or type(e).__name__)
+
+    def stop(self):
+        self.importer.stop()
@@ -1,26 +1,98 @@
 import os
+import uuid
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene, 
     QPushButton, QToolBar, QSizePolicy, QLineEdit, QFileDialog, 
-    QMessageBox, QInputDialog
+    QMessageBox, QInputDialog, QGraphicsPathItem, QGraphicsSimpleTextItem,
+    QGraphicsEllipseItem, QGraphicsItem
 )
-from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QFontDatabase, QPixmap, QImage, QPainter
-from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import (
+    QColor, QBrush, QPen, QFont, QFontDatabase, QPixmap, QImage, QPainter,
+    QPainterPath, QPainterPathStroker
+)
+from PyQt6.QtCore import Qt, QPointF, QRectF
 from core.gamification import gamification_engine
+from core.metrics import metrics
+from core.geometry import simplify_points, pack_points, unpack_points
+from core.database import db_manager
+from gui.background_loader import BackgroundLoader
+from gui.map_exporter import MapExportService, MapRenderer
+
+class LodSimpleTextItem(QGraphicsSimpleTextItem):
+    """Подпись, которая не рисуется при сильном отдалении."""
+
+    def __init__(self, text: str, min_lod: float):
+        super().__init__(text)
+        self.min_lod = min_lod
+
+    def paint(self, painter, option, widget=None):
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < self.min_lod:
+            return
+        super().paint(painter, option, widget)
+
+class LodEllipseItem(QGraphicsEllipseItem):
+    """Маркер, который не рисуется при сильном отдалении."""
+
+    def __init__(self, rect: QRectF, min_lod: float):
+        super().__init__(rect)
+        self.min_lod = min_lod
+
+    def paint(self, painter, option, widget=None):
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < self.min_lod:
+            return
+        super().paint(painter, option, widget)
 
 class MapEditor(QWidget):
     
+    STROKE_COLOR = MapRenderer.STROKE_COLOR
+    STROKE_WIDTH = MapRenderer.STROKE_WIDTH
+    SIMPLIFY_TOLERANCE = 1.0
+    ERASE_RADIUS = 4
+    
+    CANVAS_WIDTH = 20000
+    CANVAS_HEIGHT = 20000
+    MIN_ZOOM = 0.02
+    MAX_ZOOM = 8.0
+    ZOOM_STEP = 1.15
+    LABEL_MIN_LOD = 0.5
+    MARKER_MIN_LOD = 0.15
+    
+    ELEMENT_UID = 0
+    MARKER_COLORS = MapRenderer.MARKER_COLORS
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.current_quest_id = -1
         self.current_tool = "path" 
         self.last_point = None
         self.background_item = None
+        self.current_stroke = None
+        self._stroke_path = None
+        self._stroke_points = []
+        self.background_path = None
+        self._background_meta = None
+        self._background_level = None
+        self._pending_level = None
+        
+        self._elements = {}
+        self._element_items = {}
+        self._dirty_uids = set()
+        self._deleted_uids = set()
+        self._background_dirty = False
         
         self.setup_font()
         self.setup_ui()
         
+        self.background_loader = BackgroundLoader(self)
+        self.background_loader.pyramid_ready.connect(self._on_pyramid_ready)
+        self.background_loader.level_loaded.connect(self._on_background_level_loaded)
+        self.background_loader.failed.connect(self._on_background_failed)
+        
+        self.export_service = MapExportService(self)
+        self.export_service.finished.connect(self._on_export_finished)
+        self.export_service.failed.connect(self._on_export_failed)
+        
     def setup_font(self):
         font_path = os.path.join(os.path.dirname(__file__), '..', 'assets', 'fonts', 'Uncial_Antiqua.ttf')
         if os.path.exists(font_path):
@@ -36,24 +108,35 @@ class MapEditor(QWidget):
         self.tavern_btn = QPushButton("Таверна 🟡")
         self.text_btn = QPushButton("Текст 📝")
         self.erase_btn = QPushButton("Ластик 🗑️")
+        self.pan_btn = QPushButton("Рука ✋")
+        self.fit_btn = QPushButton("🔍 Вписать")
         self.save_btn = QPushButton("💾 Сохранить")
+        self.export_btn = QPushButton("📤 Экспорт")
         self.load_bg_btn = QPushButton("🖼️ Фон")
         
-        for btn in [self.path_btn, self.city_btn, self.lair_btn, self.tavern_btn, self.text_btn, self.erase_btn]:
+        for btn in [self.path_btn, self.city_btn, self.lair_btn, self.tavern_btn, self.text_btn, self.erase_btn, self.pan_btn]:
             toolbar.addWidget(btn)
         toolbar.addSeparator()
+        toolbar.addWidget(self.fit_btn)
         toolbar.addWidget(self.load_bg_btn)
         toolbar.addWidget(self.save_btn)
+        toolbar.addWidget(self.export_btn)
         
         main_layout.addWidget(toolbar)
 
         self.scene = QGraphicsScene(self)
-        self.scene.setSceneRect(0, 0, 800, 600)
-        self.scene.setBackgroundBrush(QBrush(QColor('#f4e4bc'))) 
+        self.scene.setSceneRect(0, 0, self.CANVAS_WIDTH, self.CANVAS_HEIGHT)
+        self.scene.setBackgroundBrush(QBrush(QColor(MapRenderer.BACKGROUND_COLOR))) 
         
         self.view = QGraphicsView(self.scene)
-        self.view.setFixedSize(800, 600)
+        self.view.setMinimumSize(800, 600)
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.view.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
+        self.view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.view.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        self.view.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.view.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.view.centerOn(400, 300)
         main_layout.addWidget(self.view)
         
         self.path_btn.clicked.connect(lambda: self._set_tool("path"))
@@ -62,19 +145,27 @@ class MapEditor(QWidget):
         self.tavern_btn.clicked.connect(lambda: self._set_tool("tavern"))
         self.text_btn.clicked.connect(lambda: self._set_tool("text"))
         self.erase_btn.clicked.connect(lambda: self._set_tool("erase"))
+        self.pan_btn.clicked.connect(lambda: self._set_tool("pan"))
+        self.fit_btn.clicked.connect(self._fit_to_content)
         self.save_btn.clicked.connect(self._save_map)
+        self.export_btn.clicked.connect(self._export_map)
         self.load_bg_btn.clicked.connect(self._load_background)
 
         self.view.mousePressEvent = self._mouse_press_event
         self.view.mouseMoveEvent = self._mouse_move_event
         self.view.mouseReleaseEvent = self._mouse_release_event
+        self.view.wheelEvent = self._wheel_event
         
         self._update_cursor()
 
     def _set_tool(self, tool_name: str):
+        self._finish_stroke()
         self.current_tool = tool_name
         self.last_point = None
         self._update_cursor()
+        
+        drag_mode = QGraphicsView.DragMode.ScrollHandDrag if tool_name == "pan" else QGraphicsView.DragMode.NoDrag
+        self.view.setDragMode(drag_mode)
         print(f"Выбран инструмент: {tool_name}")
         
     def _update_cursor(self):
@@ -86,89 +177,391 @@ class MapEditor(QWidget):
     def _mouse_press_event(self, event):
         scene_pos = self.view.mapToScene(event.pos())
         
-        if not (0 <= scene_pos.x() <= 800 and 0 <= scene_pos.y() <= 600):
+        if not self.scene.sceneRect().contains(scene_pos):
             return
 
         if event.button() == Qt.MouseButton.LeftButton:
             
             if self.current_tool == "path":
                 self.last_point = scene_pos
+                self._start_stroke(scene_pos)
                 
-            elif self.current_tool in ("city", "lair", "tavern"):
-                color_map = {"city": Qt.GlobalColor.green, "lair": Qt.GlobalColor.red, "tavern": Qt.GlobalColor.yellow}
-                brush_color = color_map.get(self.current_tool)
-                
-                item = self.scene.addEllipse(scene_pos.x()-5, scene_pos.y()-5, 10, 10, QPen(Qt.GlobalColor.black), QBrush(brush_color))
-                item.setZValue(10)
-                
-                label = self.scene.addText(self.current_tool.capitalize())
-                label.setPos(scene_pos.x() + 10, scene_pos.y() - 10)
-                label.setFont(QFont("Uncial Antiqua", 10))
-                label.setZValue(10)
+            elif self.current_tool in self.MARKER_COLORS:
+                self._add_element({
+                    'uid': uuid.uuid4().hex, 'kind': 'marker', 'style': self.current_tool,
+                    'x': scene_pos.x(), 'y': scene_pos.y(), 'text': self.current_tool.capitalize(),
+                })
                 
             elif self.current_tool == "text":
                 text, ok = QInputDialog.getText(self, "Текст", "Введите текст метки:")
                 if ok and text:
-                    item = self.scene.addText(text)
-                    item.setPos(scene_pos)
-                    item.setFont(QFont("Uncial Antiqua", 12))
-                    item.setZValue(10)
+                    self._add_element({
+                        'uid': uuid.uuid4().hex, 'kind': 'label',
+                        'x': scene_pos.x(), 'y': scene_pos.y(), 'text': text,
+                    })
                     
             elif self.current_tool == "erase":
-                items = self.scene.items(scene_pos)
-                for item in items:
-                    if item != self.background_item and item.zValue() > -100:
-                        self.scene.removeItem(item)
-                        break
+                item = self._item_at(scene_pos)
+                if item is not None:
+                    self._remove_element(item)
                         
         QGraphicsView.mousePressEvent(self.view, event)
 
     def _mouse_move_event(self, event):
-        if self.current_tool == "path" and self.last_point and (event.buttons() & Qt.MouseButton.LeftButton):
+        if self.current_tool == "path" and self.current_stroke is not None and (event.buttons() & Qt.MouseButton.LeftButton):
             scene_pos = self.view.mapToScene(event.pos())
             
-            pen = QPen(QColor('#795548'), 3)
-            pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-            
-            line = self.scene.addLine(self.last_point.x(), self.last_point.y(), scene_pos.x(), scene_pos.y(), pen)
-            line.setZValue(0)
-            
-            self.last_point = scene_pos
+            if scene_pos != self.last_point:
+                self._stroke_path.lineTo(scene_pos)
+                self._stroke_points.append((scene_pos.x(), scene_pos.y()))
+                self.current_stroke.setPath(self._stroke_path)
+                self.last_point = scene_pos
         
         QGraphicsView.mouseMoveEvent(self.view, event)
 
     def _mouse_release_event(self, event):
         if self.current_tool == "path":
+            self._finish_stroke()
             self.last_point = None
             
         QGraphicsView.mouseReleaseEvent(self.view, event)
 
+    def _wheel_event(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return
+        
+        current = self.view.transform().m11()
+        target = max(self.MIN_ZOOM, min(self.MAX_ZOOM, current * (self.ZOOM_STEP ** steps)))
+        factor = target / current
+        self.view.scale(factor, factor)
+        self._update_background_level()
+        event.accept()
 
-    def _save_map(self):
+    def _fit_to_content(self):
+        rect = self._content_rect()
+        self.view.fitInView(rect, Qt.AspectRatioMode.KeepAspectRatio)
+        
+        # fitInView не знает о пределах масштаба колеса: маленький набросок увеличился бы сверх MAX_ZOOM.
+        current = self.view.transform().m11()
+        target = max(self.MIN_ZOOM, min(self.MAX_ZOOM, current))
+        if target != current:
+            factor = target / current
+            self.view.scale(factor, factor)
+            self.view.centerOn(rect.center())
+        self._update_background_level()
+
+    def _stroke_pen(self) -> QPen:
+        pen = QPen(QColor(self.STROKE_COLOR), self.STROKE_WIDTH)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        return pen
+
+    def _start_stroke(self, scene_pos: QPointF):
+        self._finish_stroke()
+        
+        self._stroke_path = QPainterPath(scene_pos)
+        self._stroke_points = [(scene_pos.x(), scene_pos.y())]
+        
+        self.current_stroke = self._create_stroke_item(self._stroke_path)
+
+    def _finish_stroke(self):
+        """Завершает штрих: упрощает точки и пересобирает путь одним элементом."""
+        if self.current_stroke is None:
+            return
+        
+        points = simplify_points(self._stroke_points, self.SIMPLIFY_TOLERANCE)
+        self.scene.removeItem(self.current_stroke)
+        if len(points) >= 2:
+            self._add_element({
+                'uid': uuid.uuid4().hex, 'kind': 'stroke', 'points': pack_points(points),
+                'x': points[0][0], 'y': points[0][1],
+            })
+        
+        self.current_stroke = None
+        self._stroke_path = None
+        self._stroke_points = []
+
+    @staticmethod
+    def _path_from_points(points) -> QPainterPath:
+        path = QPainterPath(QPointF(*points[0]))
+        for x, y in points[1:]:
+            path.lineTo(x, y)
+        return path
+
+    def _create_stroke_item(self, path: QPainterPath) -> QGraphicsPathItem:
+        item = QGraphicsPathItem(path)
+        item.setPen(self._stroke_pen())
+        item.setZValue(0)
+        self.scene.addItem(item)
+        return item
+
+    def _build_element_items(self, element) -> list:
+        kind = element['kind']
+        x, y = element['x'], element['y']
+        
+        if kind == 'stroke':
+            items = [self._create_stroke_item(self._path_from_points(unpack_points(element['points'])))]
+        
+        elif kind == 'marker':
+            brush_color = self.MARKER_COLORS.get(element['style'], Qt.GlobalColor.gray)
+            item = LodEllipseItem(QRectF(x-5, y-5, 10, 10), self.MARKER_MIN_LOD)
+            item.setPen(QPen(Qt.GlobalColor.black))
+            item.setBrush(QBrush(brush_color))
+            
+            label = LodSimpleTextItem(element['text'], self.LABEL_MIN_LOD)
+            label.setPos(x + 10, y - 10)
+            label.setFont(QFont("Uncial Antiqua", 10))
+            items = [item, label]
+        
+        else:
+            item = LodSimpleTextItem(element['text'], self.LABEL_MIN_LOD)
+            item.setPos(x, y)
+            item.setFont(QFont("Uncial Antiqua", 12))
+            items = [item]
+        
+        for item in items:
+            if kind != 'stroke':
+                item.setZValue(10)
+                self.scene.addItem(item)
+            # Кэш в координатах устройства: при панорамировании элементы не перерисовываются.
+            item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        return items
+
+    def _add_element(self, element, dirty: bool = True):
+        uid = element['uid']
+        items = self._build_element_items(element)
+        for item in items:
+            item.setData(self.ELEMENT_UID, uid)
+        
+        self._elements[uid] = element
+        self._element_items[uid] = items
+        if dirty:
+            self._dirty_uids.add(uid)
+            self._deleted_uids.discard(uid)
+
+    def _remove_element(self, item):
+        """Удаляет элемент целиком (штрих или маркер вместе с подписью)."""
+        uid = item.data(self.ELEMENT_UID)
+        if uid is None:
+            self.scene.removeItem(item)
+            return
+        
+        for element_item in self._element_items.pop(uid, [item]):
+            self.scene.removeItem(element_item)
+        self._elements.pop(uid, None)
+        
+        self._dirty_uids.discard(uid)
+        self._deleted_uids.add(uid)
+
+    def _clear_elements(self):
+        self._finish_stroke()
+        for items in self._element_items.values():
+            for item in items:
+                self.scene.removeItem(item)
+        self._elements.clear()
+        self._element_items.clear()
+        self._dirty_uids.clear()
+        self._deleted_uids.clear()
+        self._background_dirty = False
         
-        image = QImage(800, 600, QImage.Format.Format_ARGB32)
-        image.fill(Qt.GlobalColor.transparent)
+        if self.background_item:
+            self.scene.removeItem(self.background_item)
+            self.background_item = None
+        self.background_path = None
+        self._background_meta = None
+        self._background_level = None
+        self._pending_level = None
+        self.scene.setBackgroundBrush(QBrush(QColor(MapRenderer.BACKGROUND_COLOR)))
+
+    def has_unsaved_changes(self) -> bool:
+        return bool(self._dirty_uids or self._deleted_uids or self._background_dirty)
+
+    def set_quest(self, quest_id: int):
+        """Привязывает редактор к квесту: сохраняет текущую карту и загружает карту квеста."""
+        if quest_id == -1 or quest_id == self.current_quest_id:
+            return
         
-        painter = QPainter(image)
-        self.scene.render(painter)
-        painter.end()
+        data = db_manager.get_map(quest_id)
         
+        if self.current_quest_id == -1 and self._elements and data is None:
+            # Набросок без квеста переходит к только что созданному квесту.
+            self.current_quest_id = quest_id
+            return
+        
+        if self.has_unsaved_changes():
+            self._persist_map()
+        self._apply_map(quest_id, data)
+
+    def release_quest(self, quest_id: int):
+        """Отвязывает редактор от квеста, ушедшего в архив, чтобы правки не завели в рабочей базе вторую карту."""
+        if quest_id != -1 and quest_id == self.current_quest_id:
+            self._apply_map(-1, None)
+
+    def _apply_map(self, quest_id: int, data):
+        self._clear_elements()
+        self.current_quest_id = quest_id
+        
+        if not data:
+            return
+        
+        with metrics.span("map.load"):
+            self.view.setUpdatesEnabled(False)
+            try:
+                if data['background_path'] and os.path.exists(data['background_path']):
+                    self._set_background(data['background_path'])
+                for element in data['elements']:
+                    self._add_element(element, dirty=False)
+            finally:
+                self.view.setUpdatesEnabled(True)
+        
+        self._background_dirty = False
+
+    def save_pending_changes(self) -> bool:
+        """Записывает несохранённые правки перед выходом. False — если карту не к чему привязать."""
+        self._finish_stroke()
+        if not self.has_unsaved_changes():
+            return True
+        return self._persist_map()
+
+    def _persist_map(self) -> bool:
+        if self.current_quest_id == -1:
+            return False
+        
+        upserts = [self._elements[uid] for uid in self._dirty_uids if uid in self._elements]
+        db_manager.save_map_changes(self.current_quest_id, self.background_path, upserts, list(self._deleted_uids))
+        
+        self._dirty_uids.clear()
+        self._deleted_uids.clear()
+        self._background_dirty = False
+        return True
+
+    def _item_at(self, scene_pos: QPointF):
+        r = self.ERASE_RADIUS
+        for item in self.scene.items(QRectF(scene_pos.x() - r, scene_pos.y() - r, 2 * r, 2 * r)):
+            if item == self.background_item or item.zValue() <= -100:
+                continue
+            if isinstance(item, QGraphicsPathItem):
+                # shape() пути включает его заливку, поэтому проверяем только сам штрих.
+                stroker = QPainterPathStroker()
+                stroker.setWidth(item.pen().widthF() + self.ERASE_RADIUS * 2)
+                if not stroker.createStroke(item.path()).contains(item.mapFromScene(scene_pos)):
+                    continue
+            return item
+        return None
+
+
+    def _save_map(self):
+        self._finish_stroke()
+        
+        if self.current_quest_id == -1:
+            QMessageBox.warning(self, "Ошибка", "Сначала создайте или загрузите квест, чтобы привязать к нему карту.")
+            return
+        
+        self._persist_map()
+        gamification_engine.grant_xp("SAVE_MAP")
+        QMessageBox.information(self, "Успех", f"Карта квеста #{self.current_quest_id} сохранена!")
+
+    def _content_rect(self) -> QRectF:
+        rect = self.scene.itemsBoundingRect()
+        if rect.isEmpty():
+            rect = QRectF(0, 0, 800, 600)
+        return rect
+
+    def create_snapshot(self):
+        """Неизменяемая копия карты для отрисовки вне GUI-потока."""
+        self._finish_stroke()
+        return {
+            'elements': [dict(element) for element in self._elements.values()],
+            'background_path': self.background_path,
+            'background_meta': self._background_meta,
+        }
+
+    def _export_map(self):
         default_name = f"map_{self.current_quest_id}_{datetime.now().strftime('%H%M%S')}.png"
-        path, _ = QFileDialog.getSaveFileName(self, "Сохранить карту", default_name, "PNG (*.png)")
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Экспорт карты", default_name, ";;".join(MapExportService.FORMATS.keys())
+        )
+        if not path:
+            return
         
-        if path:
-            image.save(path)
-            gamification_engine.grant_xp("SAVE_MAP")
-            QMessageBox.information(self, "Успех", f"Карта сохранена!")
+        dpi, ok = QInputDialog.getItem(self, "Экспорт карты", "Разрешение (DPI):", MapExportService.DPI_OPTIONS, 1, False)
+        if not ok:
+            return
+        
+        fmt = MapExportService.FORMATS.get(selected_filter, "png")
+        if not path.lower().endswith(f".{fmt}"):
+            path = f"{os.path.splitext(path)[0]}.{fmt}"
+        
+        self.export_btn.setEnabled(False)
+        self.export_service.export(self.create_snapshot(), path, fmt, int(dpi))
+
+    def _on_export_finished(self, path: str):
+        self.export_btn.setEnabled(True)
+        QMessageBox.information(self, "Успех", f"Карта экспортирована:\n{path}")
+
+    def _on_export_failed(self, message: str):
+        self.export_btn.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать карту: {message}")
 
     def _load_background(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Загрузить фон", "", "Изображения (*.png *.jpg)")
+        path, _ = QFileDialog.getOpenFileName(self, "Загрузить фон", "", "Изображения (*.png *.jpg *.jpeg *.tif *.tiff *.webp)")
         if path:
-            pixmap = QPixmap(path)
-            if self.background_item:
-                self.scene.removeItem(self.background_item)
-                
-            self.background_item = self.scene.addPixmap(pixmap.scaled(800, 600, Qt.AspectRatioMode.IgnoreAspectRatio))
+            self._set_background(path)
+            self._background_dirty = True
+
+    def _set_background(self, path: str):
+        """Запускает декодирование фона в фоновом потоке; элемент появится по готовности."""
+        if self.background_item:
+            self.scene.removeItem(self.background_item)
+            self.background_item = None
+            self.scene.setBackgroundBrush(QBrush(QColor(MapRenderer.BACKGROUND_COLOR)))
+        
+        self.background_path = path
+        self._background_meta = None
+        self._background_level = None
+        self._pending_level = None
+        self.background_loader.load(path)
+
+    def _on_pyramid_ready(self, path: str, meta):
+        if path != self.background_path:
+            return
+        self._background_meta = meta
+        self._update_background_level()
+
+    def _update_background_level(self):
+        if self._background_meta is None:
+            return
+        
+        level = BackgroundLoader.pick_level(self._background_meta, self.view.transform().m11())
+        if level in (self._background_level, self._pending_level):
+            return
+        
+        self._pending_level = level
+        self.background_loader.request_level(self.background_path, self._background_meta, level)
+
+    def _on_background_level_loaded(self, path: str, level: int, image: QImage):
+        if path != self.background_path or level != self._pending_level:
+            return
+        
+        # Держим в памяти только один уровень пирамиды — тот, что нужен при текущем масштабе.
+        pixmap = QPixmap.fromImage(image)
+        if self.background_item is None:
+            self.background_item = self.scene.addPixmap(pixmap)
             self.background_item.setPos(0, 0)
+            self.background_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
             self.background_item.setZValue(-100)
-            self.scene.setBackgroundBrush(Qt.GlobalColor.transparent)
+        else:
+            self.background_item.setPixmap(pixmap)
+        self.background_item.setScale(self._background_meta['width'] / image.width())
+        self.scene.setBackgroundBrush(Qt.GlobalColor.transparent)
+        
+        self._background_level = level
+        self._pending_level = None
+
+    def _on_background_failed(self, path: str, message: str):
+        if path != self.background_path:
+            return
+        self._pending_level = None
+        print(f"❌ Ошибка загрузки фона: {message}")
+        QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить фон: {message}")
@@ -0,0 +1,332 @@
+import os
+import json
+import math
+import base64
+from typing import Dict, Any, List, Tuple
+
+from PyQt6.QtCore import (
+    QObject, QRunnable, QThreadPool, QRectF, QPointF, QSize, QBuffer, QIODevice, Qt, pyqtSignal
+)
+from PyQt6.QtGui import QImage, QPainter, QPainterPath, QPen, QBrush, QColor, QFont, QFontMetricsF
+from PyQt6.QtSvg import QSvgGenerator
+
+from core.database import db_manager
+from core.geometry import unpack_points
+from core.metrics import metrics
+from gui.background_loader import BackgroundLoader
+
+class MapRenderer:
+    """Рисует снимок карты любым QPainter. Не трогает QGraphicsScene, поэтому работает в потоке."""
+
+    BACKGROUND_COLOR = '#f4e4bc'
+    STROKE_COLOR = '#795548'
+    STROKE_WIDTH = 3
+    MARKER_COLORS = {"city": Qt.GlobalColor.green, "lair": Qt.GlobalColor.red, "tavern": Qt.GlobalColor.yellow}
+    MARKER_FONT_PT = 10
+    LABEL_FONT_PT = 12
+    SCREEN_DPI = 96
+
+    @classmethod
+    def font(cls, point_size: int) -> QFont:
+        # Размер в пикселях сцены, чтобы результат не зависел от DPI устройства рисования.
+        font = QFont("Uncial Antiqua")
+        font.setPixelSize(round(point_size * cls.SCREEN_DPI / 72))
+        return font
+
+    @classmethod
+    def prepare(cls, elements: List[Dict[str, Any]]) -> List[Tuple[QRectF, Dict[str, Any], Any]]:
+        """Готовит к отрисовке: границы, пути и шрифты считаются один раз на снимок."""
+        marker_font, label_font = cls.font(cls.MARKER_FONT_PT), cls.font(cls.LABEL_FONT_PT)
+        marker_metrics, label_metrics = QFontMetricsF(marker_font), QFontMetricsF(label_font)
+        half_pen = cls.STROKE_WIDTH / 2
+
+        prepared = []
+        for element in elements:
+            kind, x, y = element['kind'], element['x'], element['y']
+            if kind == 'stroke':
+                points = unpack_points(element['points'])
+                path = QPainterPath(QPointF(*points[0]))
+                for px, py in points[1:]:
+                    path.lineTo(px, py)
+                bounds = path.boundingRect().adjusted(-half_pen, -half_pen, half_pen, half_pen)
+                prepared.append((bounds, element, path))
+            elif kind == 'marker':
+                text_width = marker_metrics.horizontalAdvance(element['text'] or '')
+                bounds = QRectF(x - 5, y - 10, 15 + text_width, max(10.0, marker_metrics.height()) + 5)
+                prepared.append((bounds, element, marker_font))
+            else:
+                text_width = label_metrics.horizontalAdvance(element['text'] or '')
+                bounds = QRectF(x, y, text_width, label_metrics.height())
+                prepared.append((bounds, element, label_font))
+        return prepared
+
+    @classmethod
+    def content_rect(cls, prepared, background_meta: Dict[str, Any] | None) -> QRectF:
+        rect = QRectF()
+        for bounds, _, _ in prepared:
+            rect = rect.united(bounds)
+        if background_meta:
+            rect = rect.united(QRectF(0, 0, background_meta['width'], background_meta['height']))
+        if rect.isEmpty():
+            rect = QRectF(0, 0, 800, 600)
+        return rect
+
+    @classmethod
+    def paint(cls, painter: QPainter, prepared, source: QRectF, background: 'BackgroundTiles | None' = None):
+        """Рисует область source в текущих координатах сцены painter'а."""
+        painter.fillRect(source, QColor(cls.BACKGROUND_COLOR))
+
+        if background is not None:
+            background.paint(painter, source)
+
+        pen = QPen(QColor(cls.STROKE_COLOR), cls.STROKE_WIDTH)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setPen(pen)
+        for bounds, element, path in prepared:
+            if element['kind'] == 'stroke' and bounds.intersects(source):
+                painter.drawPath(path)
+
+        for bounds, element, font in prepared:
+            kind = element['kind']
+            if kind == 'stroke' or not bounds.intersects(source):
+                continue
+            x, y = element['x'], element['y']
+            if kind == 'marker':
+                painter.setPen(QPen(Qt.GlobalColor.black))
+                painter.setBrush(QBrush(cls.MARKER_COLORS.get(element['style'], Qt.GlobalColor.gray)))
+                painter.drawEllipse(QRectF(x - 5, y - 5, 10, 10))
+                x, y = x + 10, y - 10
+            painter.setFont(font)
+            painter.setPen(QPen(Qt.GlobalColor.black))
+            painter.drawText(QRectF(x, y, bounds.width() + 10, bounds.height() + 10),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, element['text'] or '')
+
+class BackgroundTiles:
+    """Фон для экспорта: с диска читаются только плитки уровня пирамиды, попавшие в область."""
+
+    def __init__(self, meta: Dict[str, Any], level: Dict[str, Any]):
+        self.meta = meta
+        self.level = level
+
+    def paint(self, painter: QPainter, source: QRectF):
+        width, height = self.meta['width'], self.meta['height']
+        area = QRectF(0, 0, width, height).intersected(source)
+        if area.isEmpty():
+            return
+
+        tiles = self.level.get('tiles')
+        if not tiles:
+            # Мелкий уровень хранится одним файлом.
+            image = QImage(self.level['file'])
+            if not image.isNull():
+                painter.drawImage(QRectF(0, 0, width, height), image)
+            return
+
+        # Масштаб сцена → пиксели уровня.
+        sx, sy = self.level['width'] / width, self.level['height'] / height
+        size = tiles['size']
+        first_col = max(0, int(area.left() * sx // size))
+        last_col = min(tiles['columns'] - 1, math.ceil(area.right() * sx / size) - 1)
+        first_row = max(0, int(area.top() * sy // size))
+        last_row = min(tiles['rows'] - 1, math.ceil(area.bottom() * sy / size) - 1)
+
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                image = QImage(BackgroundLoader.tile_path(self.level, row, col))
+                if image.isNull():
+                    continue
+                target = QRectF(col * size / sx, row * size / sy, image.width() / sx, image.height() / sy)
+                painter.drawImage(target, image)
+
+class _ExportSignals(QObject):
+    finished = pyqtSignal(str)
+    rendered = pyqtSignal(int, str)
+    failed = pyqtSignal(str)
+
+class _ExportTask(QRunnable):
+
+    def __init__(self, service: 'MapExportService', job: Dict[str, Any]):
+        super().__init__()
+        self.service = service
+        self.job = job
+
+    def run(self):
+        signals = self.service.signals
+        job = self.job
+        try:
+            if job['kind'] == 'file':
+                with metrics.span("map.export"):
+                    result = self.service.export_snapshot(job['snapshot'], job['path'], job['format'], job['dpi'])
+                signals.finished.emit(result)
+            else:
+                with metrics.span("map.render_for_pdf"):
+                    encoded = self.service.render_base64(job['snapshot'], job['dpi'], job['max_side'])
+                signals.rendered.emit(job['quest_id'], encoded)
+        except Exception as e:
+            # Без сигнала об ошибке кнопки экспорта остались бы заблокированными.
+            signals.failed.emit(str(e) or type(e).__name__)
+
+class MapExportService(QObject):
+    """Экспорт карты в рабочем потоке: PNG/JPEG/WebP/SVG, любой DPI, тайлы для огромных карт."""
+
+    FORMATS = {
+        "PNG (*.png)": "png",
+        "JPEG (*.jpg)": "jpg",
+        "WebP (*.webp)": "webp",
+        "SVG (*.svg)": "svg",
+    }
+    DPI_OPTIONS = ["72", "96", "150", "300", "600"]
+    TILE_SIZE = 2048
+    MAX_SINGLE_SIDE = 8192
+    QUALITY = 90
+    PDF_DPI = 150
+    PDF_MAX_SIDE = 2400
+
+    finished = pyqtSignal(str)
+    rendered = pyqtSignal(int, str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.signals = _ExportSignals()
+        self.signals.finished.connect(self.finished)
+        self.signals.rendered.connect(self.rendered)
+        self.signals.failed.connect(self.failed)
+
+    @staticmethod
+    def snapshot_from_db(quest_id: int) -> Dict[str, Any] | None:
+        data = db_manager.get_map(quest_id)
+        if not data or not (data['elements'] or data['background_path']):
+            return None
+        return {
+            'elements': data['elements'],
+            'background_path': data['background_path'],
+            'background_meta': None,
+        }
+
+    def export(self, snapshot: Dict[str, Any], path: str, fmt: str, dpi: int):
+        self.pool.start(_ExportTask(self, {'kind': 'file', 'snapshot': snapshot, 'path': path, 'format': fmt, 'dpi': dpi}))
+
+    def render_quest_map(self, quest_id: int) -> bool:
+        """Рисует карту квеста для PDF в фоне; результат придёт сигналом rendered."""
+        snapshot = self.snapshot_from_db(quest_id)
+        if snapshot is None:
+            return False
+        self.pool.start(_ExportTask(self, {
+            'kind': 'base64', 'snapshot': snapshot, 'quest_id': quest_id,
+            'dpi': self.PDF_DPI, 'max_side': self.PDF_MAX_SIDE,
+        }))
+        return True
+
+    @staticmethod
+    def _background_meta(snapshot: Dict[str, Any]) -> Dict[str, Any] | None:
+        meta = snapshot.get('background_meta')
+        path = snapshot.get('background_path')
+        if meta is None and path and os.path.exists(path):
+            meta = BackgroundLoader.build_pyramid(path)
+        return meta or None
+
+    @staticmethod
+    def _background_at(meta: Dict[str, Any] | None, scale: float) -> BackgroundTiles | None:
+        """Уровень пирамиды выбирается по итоговому масштабу вывода."""
+        if not meta:
+            return None
+        level_index = BackgroundLoader.pick_level(meta, scale)
+        level = next(level for level in meta['levels'] if level['index'] == level_index)
+        return BackgroundTiles(meta, level)
+
+    def _prepare(self, snapshot: Dict[str, Any]):
+        prepared = MapRenderer.prepare(snapshot['elements'])
+        meta = self._background_meta(snapshot)
+        return prepared, meta, MapRenderer.content_rect(prepared, meta)
+
+    @staticmethod
+    def _render_region(prepared, source: QRectF, scale: float, background: BackgroundTiles | None) -> QImage:
+        image = QImage(max(1, math.ceil(source.width() * scale)), max(1, math.ceil(source.height() * scale)),
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.scale(scale, scale)
+        painter.translate(-source.topLeft())
+        MapRenderer.paint(painter, prepared, source, background)
+        painter.end()
+        return image
+
+    def _save_image(self, image: QImage, path: str, fmt: str, dpi: int):
+        dots_per_meter = round(dpi / 0.0254)
+        image.setDotsPerMeterX(dots_per_meter)
+        image.setDotsPerMeterY(dots_per_meter)
+        if fmt == 'jpg':
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        quality = -1 if fmt == 'png' else self.QUALITY
+        if not image.save(path, fmt.upper(), quality):
+            raise OSError(f"Не удалось записать файл: {path}")
+
+    def export_snapshot(self, snapshot: Dict[str, Any], path: str, fmt: str, dpi: int) -> str:
+        scale = dpi / MapRenderer.SCREEN_DPI
+        prepared, meta, source = self._prepare(snapshot)
+        background = self._background_at(meta, scale)
+
+        if fmt == 'svg':
+            generator = QSvgGenerator()
+            generator.setFileName(path)
+            generator.setSize(QSize(math.ceil(source.width() * scale), math.ceil(source.height() * scale)))
+            generator.setViewBox(QRectF(0, 0, source.width() * scale, source.height() * scale))
+            generator.setResolution(dpi)
+            generator.setTitle("Quest Master Map")
+            painter = QPainter(generator)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.scale(scale, scale)
+            painter.translate(-source.topLeft())
+            MapRenderer.paint(painter, prepared, source, background)
+            painter.end()
+            return path
+
+        width, height = source.width() * scale, source.height() * scale
+        if max(width, height) <= self.MAX_SINGLE_SIDE:
+            self._save_image(self._render_region(prepared, source, scale, background), path, fmt, dpi)
+            return path
+
+        return self._export_tiles(prepared, source, scale, background, path, fmt, dpi)
+
+    def _export_tiles(self, prepared, source: QRectF, scale: float, background: BackgroundTiles | None,
+                      path: str, fmt: str, dpi: int) -> str:
+        """Огромная карта пишется плитками: в памяти одна выходная плитка и по одной плитке фона."""
+        tile_dir = f"{os.path.splitext(path)[0]}_tiles"
+        os.makedirs(tile_dir, exist_ok=True)
+
+        tile_scene = self.TILE_SIZE / scale
+        columns = math.ceil(source.width() / tile_scene)
+        rows = math.ceil(source.height() / tile_scene)
+
+        for row in range(rows):
+            for col in range(columns):
+                tile_source = QRectF(
+                    source.left() + col * tile_scene, source.top() + row * tile_scene, tile_scene, tile_scene
+                ).intersected(source)
+                tile = self._render_region(prepared, tile_source, scale, background)
+                self._save_image(tile, os.path.join(tile_dir, f"tile_{row}_{col}.{fmt}"), fmt, dpi)
+
+        index = {
+            'tile_size': self.TILE_SIZE, 'rows': rows, 'columns': columns, 'dpi': dpi, 'format': fmt,
+            'width': math.ceil(source.width() * scale), 'height': math.ceil(source.height() * scale),
+        }
+        with open(os.path.join(tile_dir, "tiles.json"), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        return tile_dir
+
+    def render_base64(self, snapshot: Dict[str, Any], dpi: int, max_side: int) -> str:
+        prepared, meta, source = self._prepare(snapshot)
+        scale = min(dpi / MapRenderer.SCREEN_DPI, max_side / max(source.width(), source.height()))
+        image = self._render_region(prepared, source, scale, self._background_at(meta, scale))
+
+        buffer = QBuffer()
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, "PNG")
+        return base64.b64encode(bytes(buffer.data())).decode()
@@ -0,0 +1,73 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import QTimer
+from core.metrics import metrics
+
+class MetricsPanel(QWidget):
+    """Вкладка разработчика: задержки p50/p95 и счётчики горячих участков."""
+
+    REFRESH_INTERVAL_MS = 1000
+    COLUMNS = ["Метрика", "Кол-во", "p50, мс", "p95, мс", "max, мс"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.update_ui)
+        self.refresh_timer.start()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        main_layout.addWidget(QLabel("📈 **Производительность**"))
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+
+        self.dump_button = QPushButton("💾 Сохранить метрики")
+        self.dump_button.clicked.connect(self._dump)
+
+        self.reset_button = QPushButton("♻️ Сбросить")
+        self.reset_button.clicked.connect(self._reset)
+
+        button_layout.addWidget(self.dump_button)
+        button_layout.addWidget(self.reset_button)
+        main_layout.addLayout(button_layout)
+
+    def _dump(self):
+        try:
+            metrics.dump()
+        except OSError as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить метрики: {e}")
+
+    def _reset(self):
+        metrics.reset()
+        self.update_ui()
+
+    def update_ui(self):
+        if not self.isVisible():
+            return
+
+        snapshot = metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+
+        for row, name in enumerate(sorted(snapshot)):
+            stats = snapshot[name]
+            values = [
+                name,
+                str(stats['count']),
+                f"{stats['p50_ms']:.2f}",
+                f"{stats['p95_ms']:.2f}",
+                f"{stats['max_ms']:.2f}",
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
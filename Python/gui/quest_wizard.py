@@ -2,19 +2,31 @@ import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, 
     QLineEdit, QComboBox, QSpinBox, QTextEdit, QDateTimeEdit, 
-    QPushButton, QMessageBox, QLabel, QDialog, QListWidget, QListWidgetItem
+    QPushButton, QMessageBox, QLabel, QDialog, QListWidget, QListWidgetItem,
+    QFileDialog, QProgressDialog
 )
 from PyQt6.QtCore import Qt, QDateTime, pyqtSignal, QTimer
 from PyQt6.QtGui import QKeySequence
 from core.database import db_manager
+from core.gamification import gamification_engine
+from core.validation import (
+    DIFFICULTY_OPTIONS, TITLE_MAX_LENGTH, REWARD_MIN, REWARD_MAX, DESCRIPTION_MIN_LENGTH
+)
 
 from typing import Any, Dict
 from gui.exporter_panel import ExporterPanel 
+from gui.import_worker import ImportWorker
+from gui.archive_worker import ArchiveWorker
+from core.quest_importer import QuestImporter
 
 class QuestWizard(QWidget):
     """Модуль Quest Wizard (Генератор квестов) с автосохранением и валидацией."""
 
     quest_saved = pyqtSignal(int)
+    # Вокруг архивации: до запуска переноса другие вкладки дописывают свои правки в базу,
+    # после — отпускают квесты, которые ушли в архив.
+    archive_started = pyqtSignal()
+    quests_archived = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -33,16 +45,16 @@ class QuestWizard(QWidget):
         form_layout = QFormLayout()
 
         self.title_input = QLineEdit()
-        self.title_input.setMaxLength(50)
+        self.title_input.setMaxLength(TITLE_MAX_LENGTH)
         self.title_input.setPlaceholderText("Например: Спасти рядового Райана")
         form_layout.addRow("📜 Название квеста:", self.title_input)
 
         self.difficulty_input = QComboBox()
-        self.difficulty_input.addItems(["Легкий", "Средний", "Сложный", "Эпический"])
+        self.difficulty_input.addItems(DIFFICULTY_OPTIONS)
         form_layout.addRow("✨ Сложность:", self.difficulty_input)
 
         self.reward_input = QSpinBox()
-        self.reward_input.setRange(10, 10000)
+        self.reward_input.setRange(REWARD_MIN, REWARD_MAX)
         form_layout.addRow("💰 Награда (золото):", self.reward_input)
 
         self.description_input = QTextEdit()
@@ -67,8 +79,12 @@ class QuestWizard(QWidget):
         self.load_button = QPushButton("📂 Список квестов")
         self.load_button.clicked.connect(self.open_quest_list)
         
+        self.import_button = QPushButton("📥 Импорт CSV/JSONL")
+        self.import_button.clicked.connect(self.import_quests)
+        
         buttons_layout.addWidget(self.create_button)
         buttons_layout.addWidget(self.load_button)
+        buttons_layout.addWidget(self.import_button)
         main_layout.addLayout(buttons_layout)
 
         self.exporter_panel = ExporterPanel() 
@@ -92,9 +108,9 @@ class QuestWizard(QWidget):
     def _update_description(self):
         text = self.description_input.toPlainText().strip()
         chars = len(text)
-        self.char_count_label.setText(f"Символов: {chars}/50")
+        self.char_count_label.setText(f"Символов: {chars}/{DESCRIPTION_MIN_LENGTH}")
         
-        if chars < 50:
+        if chars < DESCRIPTION_MIN_LENGTH:
             self.char_count_label.setStyleSheet("color: red;")
         else:
             self.char_count_label.setStyleSheet("color: green;")
@@ -128,6 +144,7 @@ class QuestWizard(QWidget):
             
             if self.current_quest_id != -1:
                 print(f"✅ Черновик создан ID: {self.current_quest_id}")
+                gamification_engine.record_event("QUEST_CREATED")
                 self.quest_saved.emit(self.current_quest_id)
                 self.exporter_panel.set_quest_data(self._collect_quest_data())
             return
@@ -151,25 +168,149 @@ class QuestWizard(QWidget):
         dialog.setMinimumSize(400, 500)
         layout = QVBoxLayout(dialog)
         
+        search_input = QLineEdit()
+        search_input.setPlaceholderText("🔍 Поиск (включая архив), Enter — искать")
+        layout.addWidget(search_input)
+        
         list_widget = QListWidget()
-        for q in quests:
-            item_text = f"#{q['id']} - {q['title']} ({q['difficulty']})"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, q['id']) 
-            list_widget.addItem(item)
+        
+        def fill(quest_list):
+            list_widget.clear()
+            for q in quest_list:
+                prefix = "🗄️ " if q.get('archived') else ""
+                item_text = f"{prefix}#{q['id']} - {q['title']} ({q['difficulty']})"
+                item = QListWidgetItem(item_text)
+                item.setData(Qt.ItemDataRole.UserRole, q['id']) 
+                list_widget.addItem(item)
+        
+        fill(quests)
+        search_input.returnPressed.connect(
+            lambda: fill(db_manager.search_quests(search_input.text().strip()) if search_input.text().strip() else db_manager.get_all_quests())
+        )
             
         layout.addWidget(list_widget)
         
+        buttons = QHBoxLayout()
         load_btn = QPushButton("Загрузить")
         load_btn.clicked.connect(dialog.accept)
-        layout.addWidget(load_btn)
+        history_btn = QPushButton("📜 История")
+        
+        def show_history():
+            if list_widget.currentItem():
+                self._show_history(dialog, list_widget.currentItem().data(Qt.ItemDataRole.UserRole))
+        
+        history_btn.clicked.connect(show_history)
+        archive_btn = QPushButton("🗄️ Архивировать старые")
+        archive_btn.clicked.connect(lambda: self._archive_old_quests(dialog, lambda: fill(db_manager.get_all_quests())))
+        buttons.addWidget(load_btn)
+        buttons.addWidget(history_btn)
+        buttons.addWidget(archive_btn)
+        layout.addLayout(buttons)
         
         if dialog.exec() and list_widget.currentItem():
             quest_id = list_widget.currentItem().data(Qt.ItemDataRole.UserRole)
             self.load_quest(quest_id)
 
+    def _show_history(self, parent: QWidget, quest_id: int):
+        """Все версии квеста, включая те, что лежат в архиве."""
+        history = db_manager.get_quest_history(quest_id)
+        
+        dialog = QDialog(parent)
+        dialog.setWindowTitle(f"История квеста #{quest_id}")
+        dialog.setMinimumSize(500, 300)
+        layout = QVBoxLayout(dialog)
+        
+        list_widget = QListWidget()
+        for version in history:
+            list_widget.addItem(
+                f"{version['created_at']} — {version['title']} ({version['difficulty']}), {version['reward']} золота"
+            )
+        if not history:
+            list_widget.addItem("Версий нет")
+        layout.addWidget(list_widget)
+        
+        close_btn = QPushButton("Закрыть")
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn)
+        dialog.exec()
+
+    def _archive_old_quests(self, parent: QWidget, on_done):
+        answer = QMessageBox.question(
+            parent, "Архив",
+            f"Перенести в архив просроченные квесты и квесты старше {db_manager.ARCHIVE_MAX_AGE_DAYS} дней?"
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        if self.current_quest_id != -1:
+            self._auto_save()
+        self.archive_started.emit()
+        
+        # Перенос пачками и VACUUM могут идти долго, поэтому выполняются в отдельном потоке;
+        # модальный индикатор не даёт закрыть список до окончания.
+        progress = QProgressDialog("Перенос квестов в архив...", None, 0, 0, parent)
+        progress.setWindowTitle("Архив")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        
+        self._archive_worker = ArchiveWorker(db_manager.db_path, self)
+        self._archive_worker.finished_archive.connect(progress.close)
+        self._archive_worker.failed.connect(progress.close)
+        self._archive_worker.finished_archive.connect(lambda moved: self._on_archive_done(parent, on_done, moved))
+        self._archive_worker.failed.connect(
+            lambda message: QMessageBox.critical(parent, "Архив", f"Не удалось перенести квесты в архив: {message}")
+        )
+        self._archive_worker.start()
+        progress.show()
+
+    def _on_archive_done(self, parent: QWidget, on_done, moved: int):
+        if self.current_quest_id != -1 and db_manager.get_quest(self.current_quest_id) is None:
+            self.clear_form()
+        self.quests_archived.emit()
+        on_done()
+        QMessageBox.information(parent, "Архив", f"🗄️ В архив перенесено квестов: {moved}")
+
+    def import_quests(self):
+        """Массовый импорт квестов в фоне; прерванный импорт продолжается при повторном запуске."""
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт квестов", "", "Квесты (*.csv *.jsonl)")
+        if not path:
+            return
+        
+        self.import_button.setEnabled(False)
+        self._import_progress = QProgressDialog("Импорт квестов...", "Остановить", 0, 0, self)
+        self._import_progress.setWindowTitle("Импорт")
+        
+        self._import_worker = ImportWorker(path, self)
+        self._import_worker.progress.connect(self._on_import_progress)
+        self._import_worker.finished_import.connect(lambda stats: self._on_import_done(path, stats))
+        self._import_worker.failed.connect(self._on_import_failed)
+        self._import_progress.canceled.connect(self._import_worker.stop)
+        self._import_worker.start()
+        self._import_progress.show()
+
+    def _on_import_progress(self, stats: Dict[str, int]):
+        self._import_progress.setLabelText(
+            f"Строк: {stats['rows_done']}\nИмпортировано: {stats['imported']}\nОтклонено: {stats['rejected']}"
+        )
+
+    def _finish_import(self):
+        self._import_progress.close()
+        self.import_button.setEnabled(True)
+
+    def _on_import_done(self, path: str, stats: Dict[str, int]):
+        self._finish_import()
+        QMessageBox.information(
+            self, "Импорт",
+            f"✅ Импортировано: {stats['imported']}, отклонено: {stats['rejected']}.\n"
+            f"Ошибки: {QuestImporter.errors_path(path)}"
+        )
+
+    def _on_import_failed(self, message: str):
+        self._finish_import()
+        QMessageBox.critical(self, "Ошибка импорта", f"Импорт прерван: {message}")
+
     def load_quest(self, quest_id: int):
-        """Загружает данные квеста в форму."""
+        """Загружает данные квеста в форму. Квест из архива сначала возвращается в рабочую базу."""
+        if db_manager.restore_quest(quest_id):
+            print(f"📤 Квест #{quest_id} возвращен из архива")
         data = db_manager.get_quest(quest_id)
         if not data: return
         
@@ -199,7 +340,7 @@ class QuestWizard(QWidget):
         self._set_field_style(self.title_input, title_ok)
         if not title_ok: is_valid = False
         
-        desc_ok = len(self.description_input.toPlainText().strip()) >= 50
+        desc_ok = len(self.description_input.toPlainText().strip()) >= DESCRIPTION_MIN_LENGTH
         self._set_field_style(self.description_input, desc_ok)
         if not desc_ok: is_valid = False
         return is_valid
@@ -218,6 +359,8 @@ class QuestWizard(QWidget):
              data = self._collect_quest_data()
              if 'id' in data: del data['id']
              self.current_quest_id = db_manager.create_quest(data)
+             if self.current_quest_id != -1:
+                 gamification_engine.record_event("QUEST_CREATED")
              self.quest_saved.emit(self.current_quest_id)
 
         QMessageBox.information(self, "Успех", f"✅ Квест '{self.title_input.text()}' создан!", QMessageBox.StandardButton.Ok)
@@ -0,0 +1,77 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import QTimer
+from core.database import db_manager
+from core.validation import DIFFICULTY_OPTIONS
+
+class StatisticsPanel(QWidget):
+    """Сводка по рабочим квестам. Данные берутся из сводных таблиц, поэтому обновление дешёвое."""
+
+    REFRESH_INTERVAL_MS = 2000
+    COLUMNS = ["Сложность", "Квестов", "Сумма наград"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.current_quest_id = -1
+        self.setup_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.update_ui)
+        self.refresh_timer.start()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        main_layout.addWidget(QLabel("📊 **Статистика квестов**"))
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.table)
+
+        self.totals_label = QLabel()
+        self.deadlines_label = QLabel()
+        self.versions_label = QLabel()
+        self.quest_versions_label = QLabel()
+        main_layout.addWidget(self.totals_label)
+        main_layout.addWidget(self.deadlines_label)
+        main_layout.addWidget(self.versions_label)
+        main_layout.addWidget(self.quest_versions_label)
+
+    def set_quest(self, quest_id: int):
+        self.current_quest_id = quest_id
+        self.update_ui()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_ui()
+
+    def update_ui(self):
+        if not self.isVisible():
+            return
+
+        stats = db_manager.get_statistics()
+        by_difficulty = stats['by_difficulty']
+        order = DIFFICULTY_OPTIONS + sorted(set(by_difficulty) - set(DIFFICULTY_OPTIONS))
+        self.table.setRowCount(len(order))
+
+        for row, difficulty in enumerate(order):
+            bucket = by_difficulty.get(difficulty, {'quest_count': 0, 'reward_sum': 0})
+            values = [difficulty or "—", str(bucket['quest_count']), str(bucket['reward_sum'])]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+
+        self.totals_label.setText(f"Всего квестов: {stats['total_quests']}, наград на {stats['total_reward']} золота")
+        self.deadlines_label.setText(f"⏳ Дедлайнов в ближайшие 7 дней: {stats['due_this_week']}")
+        self.versions_label.setText(
+            f"📜 Версий: {stats['total_versions']} (в среднем {stats['avg_versions_per_quest']:.1f} на квест)"
+        )
+
+        if self.current_quest_id != -1:
+            count = db_manager.get_version_count(self.current_quest_id)
+            self.quest_versions_label.setText(f"Версий текущего квеста #{self.current_quest_id}: {count}")
+        else:
+            self.quest_versions_label.setText("")
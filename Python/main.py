@@ -7,10 +7,13 @@ from PyQt6.QtWidgets import (
 from gui.quest_wizard import QuestWizard
 from gui.map_editor import MapEditor
 from gui.gamification_panel import GamificationPanel
+from gui.metrics_panel import MetricsPanel
+from gui.statistics_panel import StatisticsPanel
 from core.database import db_manager 
 from core.template_engine import template_engine
 from core.gamification import gamification_engine
 from core.batch_exporter import BatchExporter 
+from core.metrics import metrics
 
 class QuestMasterApp(QMainWindow):
     def __init__(self):
@@ -29,9 +32,16 @@ class QuestMasterApp(QMainWindow):
         self.quest_wizard = QuestWizard()
         self.map_editor = MapEditor()
         self.gamification_panel = GamificationPanel() 
+        self.statistics_panel = StatisticsPanel()
         
         self.tab_widget.addTab(self.quest_wizard, "🧙‍♂️ Генератор Квестов")
         self.tab_widget.addTab(self.map_editor, "🗺️ Редактор Карт")
+        self.tab_widget.addTab(self.statistics_panel, "📊 Статистика")
+        
+        if metrics.enabled:
+            self.metrics_panel = MetricsPanel()
+            self.tab_widget.addTab(self.metrics_panel, "📈 Метрики")
+            metrics.start_periodic_dump()
         
         self.main_layout.addWidget(self.gamification_panel)
 
@@ -40,28 +50,44 @@ class QuestMasterApp(QMainWindow):
         self.main_layout.addWidget(self.boss_fight_button)
         
         self.quest_wizard.quest_saved.connect(self._handle_quest_update)
+        self.quest_wizard.archive_started.connect(self.map_editor.save_pending_changes)
+        self.quest_wizard.quests_archived.connect(self._handle_quests_archived)
 
     def _run_boss_fight(self):
         self.boss_fight_button.setEnabled(False)
         
         BatchExporter.generate_100_quests()
-        
-        if hasattr(self, 'gamification_panel'):
-            self.gamification_panel.update_ui()
 
         self.boss_fight_button.setEnabled(True)
         QMessageBox.information(self, "Босс-Файт", "⚔️ Тест на 100 квестов завершен! Проверьте консоль и достижения.")
 
+    def closeEvent(self, event):
+        if not self.map_editor.save_pending_changes():
+            answer = QMessageBox.question(
+                self, "Несохраненная карта",
+                "Набросок карты не привязан к квесту и будет потерян. Все равно выйти?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+        event.accept()
+
     def _handle_quest_update(self, quest_id: int):
         
         if quest_id != -1:
             gamification_engine.grant_xp("CREATE_QUEST")
             
-        self.map_editor.current_quest_id = quest_id
+        self.map_editor.set_quest(quest_id)
+        self.statistics_panel.set_quest(quest_id)
         
-        self.gamification_panel.update_ui()
         print(f"Главное окно: Квест ID {quest_id} сохранен/обновлен. XP обновлен.")
 
+    def _handle_quests_archived(self):
+        map_quest_id = self.map_editor.current_quest_id
+        if map_quest_id != -1 and db_manager.get_quest(map_quest_id) is None:
+            self.map_editor.release_quest(map_quest_id)
+        self.statistics_panel.set_quest(self.quest_wizard.current_quest_id)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
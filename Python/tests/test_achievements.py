@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from core.achievements import AchievementIndex
+
+class AchievementIndexTest(unittest.TestCase):
+    """Правила достижений: пороги, окна, условия на значение и восстановленное состояние."""
+
+    def _names(self, unlocked):
+        return [rule['name'] for rule in unlocked]
+
+    def test_thresholds_unlock_in_order(self):
+        index = AchievementIndex([
+            {'name': "Сотня", 'event': "QUEST_CREATED", 'count': 100},
+            {'name': "Десятка", 'event': "QUEST_CREATED", 'count': 10},
+            {'name': "Первый", 'event': "QUEST_CREATED"},
+        ])
+        self.assertEqual(self._names(index.process("QUEST_CREATED")), ["Первый"])
+        self.assertEqual(index.process("QUEST_CREATED", amount=8), [])
+        self.assertEqual(self._names(index.process("QUEST_CREATED", amount=95)), ["Десятка", "Сотня"])
+        self.assertEqual(index.counters["QUEST_CREATED"], 104)
+        self.assertEqual(index.process("QUEST_CREATED"), [])
+
+    def test_other_events_are_ignored(self):
+        index = AchievementIndex([{'name': "Картограф", 'event': "SAVE_MAP", 'count': 2}])
+        self.assertEqual(index.process("EXPORT_PDF", amount=5), [])
+        self.assertEqual(self._names(index.process("SAVE_MAP", amount=2)), ["Картограф"])
+
+    def test_unlocked_rules_are_skipped_and_counters_restored(self):
+        rules = [
+            {'name': "Первый", 'event': "QUEST_CREATED", 'count': 1},
+            {'name': "Десятка", 'event': "QUEST_CREATED", 'count': 10},
+        ]
+        index = AchievementIndex(rules, unlocked=["Первый"], counters={"QUEST_CREATED": 9})
+        self.assertEqual(self._names(index.process("QUEST_CREATED")), ["Десятка"])
+        self.assertEqual(index.counters["QUEST_CREATED"], 10)
+
+    def test_min_and_max_value(self):
+        index = AchievementIndex([
+            {'name': "Быстрый", 'event': "BOSS_FIGHT", 'max_value': 5.0},
+            {'name': "Большой", 'event': "BOSS_FIGHT_QUESTS", 'min_value': 10},
+        ])
+        self.assertEqual(index.process("BOSS_FIGHT"), [])
+        self.assertEqual(index.process("BOSS_FIGHT", value=7.5), [])
+        self.assertEqual(self._names(index.process("BOSS_FIGHT", value=5.0)), ["Быстрый"])
+        self.assertEqual(index.process("BOSS_FIGHT", value=1.0), [])
+
+        self.assertEqual(index.process("BOSS_FIGHT_QUESTS", value=9), [])
+        self.assertEqual(self._names(index.process("BOSS_FIGHT_QUESTS", value=10)), ["Большой"])
+
+    def test_window_rule(self):
+        rule = {'name': "Вдохновение", 'event': "QUEST_CREATED", 'count': 3, 'window_sec': 60}
+        with mock.patch("core.achievements.time.monotonic") as monotonic:
+            index = AchievementIndex([rule])
+            for now in (0.0, 10.0, 100.0, 120.0):
+                monotonic.return_value = now
+                self.assertEqual(index.process("QUEST_CREATED"), [])
+            # Окно хранит только последние count отметок: 100, 120, 150 укладываются в 60 с.
+            monotonic.return_value = 150.0
+            self.assertEqual(self._names(index.process("QUEST_CREATED")), ["Вдохновение"])
+
+    def test_window_rule_counts_one_timestamp_per_call(self):
+        rule = {'name': "Вдохновение", 'event': "QUEST_CREATED", 'count': 3, 'window_sec': 60}
+        with mock.patch("core.achievements.time.monotonic", return_value=0.0):
+            index = AchievementIndex([rule])
+            # amount двигает счётчик, но в окно добавляет одну отметку.
+            self.assertEqual(index.process("QUEST_CREATED", amount=100), [])
+            self.assertEqual(index.counters["QUEST_CREATED"], 100)
+            self.assertEqual(index.process("QUEST_CREATED"), [])
+            self.assertEqual(self._names(index.process("QUEST_CREATED")), ["Вдохновение"])
+
+if __name__ == "__main__":
+    unittest.main()
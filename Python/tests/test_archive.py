@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from core.database import DatabaseManager
+
+class ArchiveTest(unittest.TestCase):
+    """Перенос квестов в архив и обратно вместе с версиями и картами."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "archive.db"))
+        self.quest_id = self.db.create_quest({
+            'title': "Охота на Тролля", 'difficulty': "Сложный", 'reward': 300,
+            'description': "d" * 60, 'deadline': "2000-01-01T00:00:00",
+        })
+
+    def tearDown(self):
+        self.db._conn.close()
+        self.tmp.cleanup()
+
+    def _element(self, uid: str, x: float) -> dict:
+        return {'uid': uid, 'kind': 'marker', 'x': x, 'y': 0.0, 'text': None, 'style': None, 'points': None}
+
+    def _orphans(self) -> int:
+        cursor = self.db._conn.cursor()
+        total = 0
+        for schema in ("main", "archive"):
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {schema}.map_elements "
+                f"WHERE map_id NOT IN (SELECT id FROM {schema}.maps)"
+            )
+            total += cursor.fetchone()[0]
+        return total
+
+    def test_map_saved_after_archive_is_merged_on_restore(self):
+        self.db.save_map_changes(self.quest_id, "old.png", [self._element("a", 1.0), self._element("b", 1.0)], [])
+        self.assertEqual(self.db.archive_quests(), 1)
+        self.assertIsNone(self.db.get_map(self.quest_id))
+
+        # Редактор, не заметивший архивации, сохраняет карту в рабочую базу.
+        self.db._conn.execute("UPDATE archive.maps SET updated_at = '2000-01-01 00:00:00'")
+        self.db._conn.commit()
+        self.db.save_map_changes(self.quest_id, "new.png", [self._element("b", 2.0), self._element("c", 2.0)], [])
+
+        self.assertTrue(self.db.restore_quest(self.quest_id))
+        game_map = self.db.get_map(self.quest_id)
+        self.assertEqual(game_map['background_path'], "new.png")
+        elements = {e['uid']: e['x'] for e in game_map['elements']}
+        self.assertEqual(elements, {'a': 1.0, 'b': 2.0, 'c': 2.0})
+        self.assertEqual(self._orphans(), 0)
+
+        cursor = self.db._conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM archive.maps")
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_archive_and_restore_keep_map(self):
+        map_id = self.db.save_map_changes(self.quest_id, "bg.png", [self._element("a", 1.0)], [])
+        self.db.archive_quests()
+        self.assertTrue(self.db.restore_quest(self.quest_id))
+
+        game_map = self.db.get_map(self.quest_id)
+        self.assertEqual(game_map['id'], map_id)
+        self.assertEqual([e['uid'] for e in game_map['elements']], ["a"])
+        self.assertEqual(self._orphans(), 0)
+
+    def test_history_spans_main_and_archive(self):
+        self.db.update_quest(self.quest_id, {'reward': 400})
+        self.db.archive_quests()
+        self.assertEqual(self.db.get_quest_history(self.quest_id, include_archive=False), [])
+        archived = self.db.get_quest_history(self.quest_id)
+        self.assertEqual([v['reward'] for v in archived], [300, 400])
+
+        self.db.restore_quest(self.quest_id)
+        self.db.update_quest(self.quest_id, {'reward': 500})
+        history = self.db.get_quest_history(self.quest_id)
+        self.assertEqual([v['reward'] for v in history], [300, 400, 500])
+        self.assertEqual([v['id'] for v in history], sorted(v['id'] for v in history))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import csv
+import json
+import tempfile
+import unittest
+
+from core.database import DatabaseManager
+from core.quest_importer import QuestImporter
+from core.validation import validate_quest, DESCRIPTION_MIN_LENGTH
+
+VALID = {
+    'title': "Охота на Тролля", 'difficulty': "Сложный", 'reward': "300",
+    'description': "d" * DESCRIPTION_MIN_LENGTH, 'deadline': "2030-01-01T12:00:00",
+}
+
+class ValidateQuestTest(unittest.TestCase):
+
+    def test_valid_quest_is_normalized(self):
+        data, errors = validate_quest(dict(VALID, title="  Охота  ", reward="300.0", deadline="2030-01-01 12:00"))
+        self.assertEqual(errors, [])
+        self.assertEqual(data['title'], "Охота")
+        self.assertEqual(data['reward'], 300)
+        self.assertEqual(data['deadline'], "2030-01-01T12:00:00")
+
+    def test_invalid_fields_are_reported(self):
+        cases = {
+            'title': "",
+            'difficulty': "Смертельный",
+            'reward': "5",
+            'description': "коротко",
+            'deadline': "завтра",
+        }
+        for field, value in cases.items():
+            data, errors = validate_quest(dict(VALID, **{field: value}))
+            self.assertIsNone(data, field)
+            self.assertEqual(len(errors), 1, field)
+            self.assertTrue(errors[0].startswith(f"{field}:"), errors)
+
+        _, errors = validate_quest(dict(VALID, reward="12.5"))
+        self.assertEqual(errors, ["reward: не целое число"])
+
+class QuestImporterTest(unittest.TestCase):
+    """Импорт пачками с контрольной точкой: остановка и повторный запуск не дублируют квесты."""
+
+    ROWS = 500
+    CHUNK_SIZE = 50
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "import.db")
+        self.csv_path = os.path.join(self.tmp.name, "quests.csv")
+
+        self.invalid_rows = set()
+        with open(self.csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(VALID))
+            writer.writeheader()
+            for i in range(1, self.ROWS + 1):
+                row = dict(VALID, title=f"Квест {i}")
+                if i % 7 == 0:
+                    row['reward'] = "много"
+                    self.invalid_rows.add(i)
+                writer.writerow(row)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _importer(self, progress=None) -> QuestImporter:
+        importer = QuestImporter(self.db_path, workers=1, progress=progress)
+        importer.CHUNK_SIZE = self.CHUNK_SIZE
+        importer.MAX_IN_FLIGHT = 2
+        return importer
+
+    def _quest_titles(self):
+        db = DatabaseManager(self.db_path)
+        try:
+            return [q['title'] for q in db.get_all_quests()]
+        finally:
+            db._conn.close()
+
+    def test_stop_and_resume(self):
+        chunks_seen = []
+
+        def stop_after_two_chunks(stats):
+            chunks_seen.append(stats)
+            if len(chunks_seen) == 2:
+                importer.stop()
+
+        importer = self._importer(stop_after_two_chunks)
+        stats = importer.run(self.csv_path)
+        self.assertEqual(stats['rows_done'], 2 * self.CHUNK_SIZE)
+        self.assertEqual(len(self._quest_titles()), stats['imported'])
+
+        stats = self._importer().run(self.csv_path)
+        expected_rejected = len(self.invalid_rows)
+        self.assertEqual(stats, {
+            'rows_done': self.ROWS,
+            'imported': self.ROWS - expected_rejected,
+            'rejected': expected_rejected,
+        })
+
+        titles = self._quest_titles()
+        self.assertEqual(len(titles), self.ROWS - expected_rejected)
+        self.assertEqual(len(set(titles)), len(titles))
+
+        with open(QuestImporter.errors_path(self.csv_path), 'r', encoding='utf-8') as f:
+            errors = [json.loads(line) for line in f]
+        self.assertEqual(sorted(item['row'] for item in errors), sorted(self.invalid_rows))
+        self.assertTrue(all(item['errors'] == ["reward: не целое число"] for item in errors))
+
+    def test_finished_import_is_not_repeated(self):
+        first = self._importer().run(self.csv_path)
+        second = self._importer().run(self.csv_path)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self._quest_titles()), first['imported'])
+
+    def test_jsonl_parse_errors_are_rejected(self):
+        path = os.path.join(self.tmp.name, "quests.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(VALID, ensure_ascii=False) + "\n")
+            f.write("{не json\n")
+            f.write("[1, 2]\n")
+
+        stats = self._importer().run(path)
+        self.assertEqual((stats['imported'], stats['rejected']), (1, 2))
+        with open(QuestImporter.errors_path(path), 'r', encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['row'] for line in f], [2, 3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+from core.database import DatabaseManager
+from core.quest_server import QuestServer
+
+class QuestServerTest(unittest.IsolatedAsyncioTestCase):
+    """Путь запроса к /quest/{id} на временной базе-заглушке."""
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+
+        self.db_path = os.path.join(self.tmp.name, "standin.db")
+        db = DatabaseManager(self.db_path)
+        self.quest_id = db.create_quest({
+            'title': "Охота на Тролля", 'difficulty': "Сложный", 'reward': 300,
+            'description': "d" * 60, 'deadline': "2030-01-01T00:00:00",
+        })
+        db._conn.close()
+
+        self.server = QuestServer(self.db_path, port=0, db_connections=2, render_workers=1)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        os.chdir(self.old_cwd)
+        self.tmp.cleanup()
+
+    async def _get(self, path: str, headers: dict | None = None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        lines = [f"GET {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+
+        head, _, body = raw.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode('latin-1').split("\r\n")
+        response_headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        return int(status_line.split()[1]), response_headers, body
+
+    async def test_json_etag_and_not_found(self):
+        status, headers, body = await self._get(f"/quest/{self.quest_id}.json")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['content-type'].startswith("application/json"))
+        quest = json.loads(body)
+        self.assertEqual(quest['id'], self.quest_id)
+        self.assertEqual(quest['title'], "Охота на Тролля")
+        self.assertEqual(quest['reward'], 300)
+
+        etag = headers['etag']
+        status, headers, body = await self._get(f"/quest/{self.quest_id}.json", {'If-None-Match': etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(headers['etag'], etag)
+        self.assertEqual(body, b"")
+
+        status, _, _ = await self._get(f"/quest/{self.quest_id}.json", {'If-None-Match': '"stale"'})
+        self.assertEqual(status, 200)
+
+        self.assertEqual((await self._get("/quest/999999.json"))[0], 404)
+        self.assertEqual((await self._get("/unknown"))[0], 404)
+        self.assertEqual((await self._get(f"/quest/{self.quest_id}.xml"))[0], 400)
+
+    async def test_only_standin_db_is_touched(self):
+        await self._get(f"/quest/{self.quest_id}.json")
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["standin.db", "standin_archive.db"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from core.database import DatabaseManager
+
+def _deadline(days: int) -> str:
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S")
+
+class StatisticsTriggersTest(unittest.TestCase):
+    """Сводные таблицы должны совпадать с прямыми COUNT/SUM по рабочей базе."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "stats.db"))
+
+    def tearDown(self):
+        self.db._conn.close()
+        self.tmp.cleanup()
+
+    def _create(self, title: str, difficulty: str, reward: int, deadline_days: int) -> int:
+        return self.db.create_quest({
+            'title': title, 'difficulty': difficulty, 'reward': reward,
+            'description': "d" * 60, 'deadline': _deadline(deadline_days),
+        })
+
+    def _expected(self):
+        cursor = self.db._conn.cursor()
+        cursor.execute("SELECT difficulty, COUNT(*), SUM(reward) FROM main.quests GROUP BY difficulty")
+        by_difficulty = {d: {'quest_count': c, 'reward_sum': s} for d, c, s in cursor.fetchall()}
+        cursor.execute(
+            "SELECT COUNT(*) FROM main.quests WHERE substr(deadline, 1, 10) "
+            "BETWEEN date('now', 'localtime') AND date('now', 'localtime', '+6 days')"
+        )
+        due_this_week = cursor.fetchone()[0]
+        cursor.execute("SELECT quest_id, COUNT(*) FROM main.quest_versions GROUP BY quest_id")
+        versions = dict(cursor.fetchall())
+        return by_difficulty, due_this_week, versions
+
+    def assertStatisticsConsistent(self):
+        by_difficulty, due_this_week, versions = self._expected()
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['by_difficulty'], by_difficulty)
+        self.assertEqual(stats['total_quests'], sum(b['quest_count'] for b in by_difficulty.values()))
+        self.assertEqual(stats['total_reward'], sum(b['reward_sum'] for b in by_difficulty.values()))
+        self.assertEqual(stats['due_this_week'], due_this_week)
+        self.assertEqual(stats['total_versions'], sum(versions.values()))
+
+        cursor = self.db._conn.cursor()
+        cursor.execute("SELECT id FROM main.quests UNION SELECT id FROM archive.quests")
+        for (quest_id,) in cursor.fetchall():
+            self.assertEqual(self.db.get_version_count(quest_id), versions.get(quest_id, 0))
+        return stats
+
+    def test_insert_update_archive_restore(self):
+        easy = self._create("Легкий квест", "Легкий", 100, 2)
+        hard = self._create("Сложный квест", "Сложный", 500, 30)
+        self._create("Еще один", "Легкий", 50, 3)
+        stats = self.assertStatisticsConsistent()
+        self.assertEqual(stats['by_difficulty']['Легкий'], {'quest_count': 2, 'reward_sum': 150})
+        self.assertEqual(stats['due_this_week'], 2)
+
+        self.db.update_quest(easy, {'difficulty': "Эпический", 'reward': 1000, 'deadline': _deadline(40)})
+        self.db.update_quest(hard, {'reward': 700})
+        stats = self.assertStatisticsConsistent()
+        self.assertEqual(stats['by_difficulty']['Легкий'], {'quest_count': 1, 'reward_sum': 50})
+        self.assertEqual(self.db.get_version_count(easy), 2)
+
+        self.db._conn.execute("UPDATE quests SET deadline = '2000-01-01T00:00:00' WHERE id = ?", (hard,))
+        self.db._conn.commit()
+        self.assertEqual(self.db.archive_quests(), 1)
+        stats = self.assertStatisticsConsistent()
+        self.assertNotIn("Сложный", stats['by_difficulty'])
+        self.assertEqual(self.db.get_version_count(hard), 0)
+
+        self.assertTrue(self.db.restore_quest(hard))
+        stats = self.assertStatisticsConsistent()
+        self.assertEqual(stats['by_difficulty']['Сложный'], {'quest_count': 1, 'reward_sum': 700})
+        self.assertEqual(self.db.get_version_count(hard), 2)
+
+    def test_rebuild_matches_triggers(self):
+        for i in range(20):
+            quest_id = self._create(f"Квест {i}", ["Легкий", "Средний", "Сложный"][i % 3], 10 * (i + 1), i % 10)
+            if i % 4 == 0:
+                self.db.update_quest(quest_id, {'reward': 999})
+        maintained = self.assertStatisticsConsistent()
+
+        self.db.rebuild_statistics()
+        self.assertEqual(self.db.get_statistics(), maintained)
+
+if __name__ == "__main__":
+    unittest.main()